@@ -1,11 +1,12 @@
 import json
+import os
 import random
 import threading
-from hyperopt import hp, fmin, tpe, Trials, STATUS_OK
 from src.rubikscube import RubiksCube
 from src.solver import BeesAlgorithm
 from src.drawer import Drawer
-from src.permutation_table import viable_moves
+from src.permutation_table import viable_moves, make_corpus
+from src.logsink import open_sink
 
 
 def load_config(file_path='config.json'):
@@ -33,21 +34,39 @@ DEFAULT_CONFIG = {
         "num_local_searches": 50,
         "max_iterations": 50,
         "save_solution": True,
+        "num_workers": 1,
+        "profile_dir": None,  # directory for a cProfile dump of every run, None disables profiling
+        "verbosity": "progress",  # "quiet", "results", "iterations" or "progress"
+        "time_limit": None,  # seconds, None for no limit
+        "max_evaluations": None,  # scored cube states, None for no limit
+        "restart_after": None,  # iterations without improvement, None to never restart
+        "cancel_granularity": 1,  # rounds of algorithms between two cancellation checks
+        "deduplicate": True,
+        "tabu_size": 0,  # recently selected states the local search may not return to, 0 disables
+        "seed": None,  # None draws a fresh seed, which is recorded in execution_log
     },
     "drawer_settings": {
         "initial_delay": 500,
         "delay_solving": 10
+    },
+    "log_settings": {
+        "backend": "csv",  # or "sqlite"
+        "path": None,  # directory of the CSV files or SQLite database file, None for next to main.py
+        "flush_interval": 5.0,
+        "buffer_size": 1000
+    },
+    "optim_settings": {
+        "max_evals": 200,
+        "num_workers": None,  # None uses every core
+        "max_iterations": 200,
+        "corpus_size": 5,
+        "corpus_seed": 0,
+        "prune_after": 10,  # None disables pruning
+        "trial_timeout": None,  # seconds, None for no limit
+        "trials_file": "optim_trials.jsonl"  # None keeps the trials in memory only
     }
 }
 
-def objective(params):
-    cube = RubiksCube(" ".join(random.choices(viable_moves, k=50)))  # use random scramble for each trial
-    solver = BeesAlgorithm(cube, max_iterations=200, **params)
-    lock = threading.Lock()
-    stop_event = threading.Event()
-    metric_solve = solver.run_solver(lock, stop_event)  # Ensure this method returns metrics like solve time
-    return {'loss': metric_solve, 'status': STATUS_OK}
-
 def main():
     config = load_config()
     lock = threading.Lock()
@@ -59,14 +78,15 @@ def main():
     mode = config['mode']
 
     if mode == "optim":
-        space = {
-            'initial_population_size': hp.choice('initial_population_size', range(2, 150)),
-            'num_scouts': hp.choice('num_scouts', range(2, 150)),
-            'num_local_searches': hp.choice('num_local_searches', range(2, 150))
-        }
-        trials = Trials()
-        best = fmin(objective, space, algo=tpe.suggest, max_evals=200, trials=trials)
-        print("Best hyperparameters:", best)
+        # Imported here, so the other modes do not need hyperopt installed
+        from src.optim import optimise, best_params, TrialStore
+        optim_settings = {**DEFAULT_CONFIG['optim_settings'], **config.get('optim_settings', {})}
+        corpus = make_corpus(optim_settings['corpus_size'], config['scramble_moves_count'], optim_settings['corpus_seed'])
+        trials = optimise(corpus, optim_settings['max_evals'], optim_settings['num_workers'] or os.cpu_count(),
+                          optim_settings['max_iterations'], prune_after=optim_settings['prune_after'],
+                          trial_timeout=optim_settings['trial_timeout'],
+                          store=TrialStore(optim_settings['trials_file']) if optim_settings['trials_file'] else None)
+        print("Best hyperparameters:", best_params(trials))
         return
 
     if mode not in ['solver']:
@@ -83,9 +103,19 @@ def main():
             solver_settings['initial_population_size'],
             solver_settings['num_scouts'],
             solver_settings['num_local_searches'],
-            solver_settings['max_iterations']
+            solver_settings['max_iterations'],
+            solver_settings.get('num_workers', 1),
+            solver_settings.get('seed')
         )
         solver.set_save(config['solver_settings']['save_solution'])
+        solver.set_profile(solver_settings.get('profile_dir'))
+        solver.set_verbosity(solver_settings.get('verbosity', DEFAULT_CONFIG['solver_settings']['verbosity']))
+        solver.set_budget(solver_settings.get('time_limit'), solver_settings.get('max_evaluations'))
+        solver.set_restart(solver_settings.get('restart_after'))
+        solver.set_cancel_granularity(solver_settings.get('cancel_granularity', 1))
+        solver.set_deduplicate(solver_settings.get('deduplicate', True))
+        solver.set_tabu_size(solver_settings.get('tabu_size', 0))
+        solver.set_log_sink(open_sink(**{**DEFAULT_CONFIG['log_settings'], **config.get('log_settings', {})}))
         solver_thread = threading.Thread(target=solver.solver_thread, args=(lock, stop_event, drawer.update_cube if mode == 'solver+visualizer' else None))
         solver_thread.start()
 
@@ -0,0 +1,287 @@
+"""
+Reproducible performance benchmarks of the cube model and the solver.
+
+Run the suite and save the results:
+
+    python -m src.benchmark run --output bench.json --label numpy
+
+Compare two result files and flag regressions (exit code 1 when there is one):
+
+    python -m src.benchmark compare baseline.json bench.json --threshold 0.1
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from .logsink import CsvSink
+from .permutation_table import make_corpus, move_opcodes
+from .rubikscube import RubiksCube
+from .solver import BeesAlgorithm
+
+alg_names = ["random_algs_edges", "random_algs_corners",
+             "random_moves_algs_moves_prim_edges", "random_moves_algs_moves_prim_corners"]
+
+# Solver settings of the iteration and end-to-end benchmarks, the defaults of config.json.
+solver_settings = {"initial_population_size": 50, "num_scouts": 50, "num_local_searches": 50}
+
+
+@contextlib.contextmanager
+def _quiet_run():
+    """
+    Discards any remaining console output of the solver and yields a log sink in a temporary directory, so benchmarks
+    neither print nor touch the real logs.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            yield CsvSink(directory)
+
+
+def _measure(run, operations, repeats):
+    """
+    Times a function several times and converts the timings to nanoseconds per operation.
+
+    Args:
+        run (function): Performs `operations` operations and returns the elapsed nanoseconds, see `_timed`.
+        operations (int): Number of operations performed by one call of `run`.
+        repeats (int): Number of timed calls.
+
+    Returns:
+        dict: The median and the minimum in nanoseconds per operation, and the per-call samples.
+    """
+    samples = [run() / operations for _ in range(repeats)]
+    return {"ns_per_op": statistics.median(samples), "min_ns_per_op": min(samples), "operations": operations,
+            "samples": samples}
+
+
+def _timed(prepare, operation):
+    """
+    Returns a function for `_measure` that runs `prepare` untimed and then times `operation` on its result.
+    """
+    def run():
+        argument = prepare()
+        start = time.perf_counter_ns()
+        operation(argument)
+        return time.perf_counter_ns() - start
+    return run
+
+
+def micro_benchmarks(seed=0, operations=2000, repeats=7):
+    """
+    Times the basic cube operations.
+
+    Every benchmark starts from the same seeded scramble and uses the same seeded inputs, so two runs only differ by
+    the speed of the code.
+
+    Args:
+        seed (int): Seed of the scramble and of the random inputs.
+        operations (int): Number of operations per timed call.
+        repeats (int): Number of timed calls per benchmark.
+
+    Returns:
+        dict: The results of `_measure`, keyed by benchmark name.
+    """
+    RubiksCube.seed_sampler(seed)
+    base = RubiksCube(make_corpus(1, 50, seed)[0])
+    base.make_alg("scramble")
+    base.get_score()
+    moves = np.random.default_rng(seed).choice(move_opcodes, size=operations).tolist()
+
+    def rotate_all(cube):
+        for move in moves:
+            cube.rotate_face(move)
+
+    results = {"rotate_face": _measure(_timed(base.copy, rotate_all), operations, repeats)}
+
+    for alg_name in alg_names:
+        def make_algs(cube, alg_name=alg_name):
+            for _ in range(operations):
+                cube.make_alg(alg_name, 1)
+        results[f"make_alg[{alg_name}]"] = _measure(_timed(base.copy, make_algs), operations, repeats)
+
+    def dirty_cubes(after_move):
+        cubes = []
+        for move in moves:
+            cube = base.copy()
+            cube.rotate_face(move)
+            if not after_move:
+                cube.load_state(cube.state)
+            cubes.append(cube)
+        return cubes
+
+    def score_all(cubes):
+        for cube in cubes:
+            cube.get_score()
+
+    results["get_score[full]"] = _measure(_timed(lambda: dirty_cubes(False), score_all), operations, repeats)
+    results["get_score[after_move]"] = _measure(_timed(lambda: dirty_cubes(True), score_all), operations, repeats)
+
+    def copy_all(cube):
+        for _ in range(operations):
+            cube.copy()
+
+    results["copy"] = _measure(_timed(lambda: base, copy_all), operations, repeats)
+    return results
+
+
+def iteration_benchmark(seed=0, iterations=10):
+    """
+    Times single `BeesAlgorithm.solve` iterations with the default solver settings.
+
+    Args:
+        seed (int): Seed of the scramble and of the solver.
+        iterations (int): Number of consecutive iterations to time.
+
+    Returns:
+        dict: The results of `_measure`, one sample per iteration.
+    """
+    with _quiet_run() as log_sink:
+        solver = BeesAlgorithm(RubiksCube(make_corpus(1, 50, seed)[0]), max_iterations=iterations, seed=seed,
+                               **solver_settings)
+        solver.set_log_sink(log_sink)
+        solver.set_verbosity("quiet")
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter_ns()
+            solver.solve()
+            samples.append(time.perf_counter_ns() - start)
+    return {"ns_per_op": statistics.median(samples), "min_ns_per_op": min(samples), "operations": 1,
+            "samples": samples}
+
+
+def end_to_end_benchmark(corpus_size=5, scramble_moves_count=50, seed=0, max_iterations=50):
+    """
+    Solves a fixed seeded corpus of scrambles with the default solver settings.
+
+    Args:
+        corpus_size (int): Number of scrambles.
+        scramble_moves_count (int): Number of moves in each scramble.
+        seed (int): Seed of the corpus and of every solver.
+        max_iterations (int): Iteration limit of every solve.
+
+    Returns:
+        dict: The total time, the number of solved scrambles and, for every scramble, its time, iterations and result.
+    """
+    runs = []
+    for scramble in make_corpus(corpus_size, scramble_moves_count, seed):
+        with _quiet_run() as log_sink:
+            solver = BeesAlgorithm(RubiksCube(scramble), max_iterations=max_iterations, seed=seed, **solver_settings)
+            solver.set_log_sink(log_sink)
+            solver.set_verbosity("quiet")
+            iterations = []
+            start = time.perf_counter_ns()
+            solver.run_solver(threading.Lock(), threading.Event(),
+                              on_iteration=lambda iteration, *scores: iterations.append(iteration))
+            elapsed = time.perf_counter_ns() - start
+        runs.append({"scramble": scramble, "ns": elapsed, "iterations": len(iterations),
+                     "solved": bool(solver.solution), "score": int(solver.solved_cube.get_score()[0])})
+    return {"total_ns": sum(run["ns"] for run in runs), "solved": sum(run["solved"] for run in runs), "runs": runs}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(label="", seed=0, quick=False):
+    """
+    Runs the whole suite.
+
+    Args:
+        label (str): Free text stored with the results, for example the name of an engine backend.
+        seed (int): Seed of every benchmark.
+        quick (bool): Fewer operations and a smaller corpus, for a fast sanity check.
+
+    Returns:
+        dict: The machine-readable results, see `compare` for how they are compared.
+    """
+    micro = micro_benchmarks(seed, operations=200 if quick else 2000, repeats=3 if quick else 7)
+    micro["solve_iteration"] = iteration_benchmark(seed, iterations=3 if quick else 10)
+    return {
+        "meta": {
+            "label": label,
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "quick": quick,
+        },
+        "micro": micro,
+        "end_to_end": end_to_end_benchmark(corpus_size=2 if quick else 5, seed=seed,
+                                           max_iterations=10 if quick else 50),
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares two results of `run_benchmarks`.
+
+    Micro-benchmarks are compared by their median time per operation, the end-to-end run by its total time. A benchmark
+    is a regression when it is slower than the baseline by more than `threshold`.
+
+    Args:
+        baseline (dict): Results to compare against.
+        current (dict): New results.
+        threshold (float): Allowed relative slowdown, 0.1 meaning 10%.
+
+    Returns:
+        list: One (name, baseline, current, ratio, regression) tuple per benchmark present in both results.
+    """
+    pairs = [(name, baseline["micro"][name]["ns_per_op"], result["ns_per_op"])
+             for name, result in current["micro"].items() if name in baseline["micro"]]
+    pairs.append(("end_to_end", baseline["end_to_end"]["total_ns"], current["end_to_end"]["total_ns"]))
+    return [(name, old, new, new / old, new / old > 1 + threshold) for name, old, new in pairs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.benchmark", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks and write the results as JSON")
+    run_parser.add_argument("--output", "-o", default="benchmark.json")
+    run_parser.add_argument("--label", default="")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--quick", action="store_true")
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(args.label, args.seed, args.quick)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        for name, result in results["micro"].items():
+            print(f"{name:45s} {result['ns_per_op']:>14,.0f} ns/op")
+        end_to_end = results["end_to_end"]
+        print(f"{'end_to_end':45s} {end_to_end['total_ns'] / 1e9:>14.2f} s "
+              f"({end_to_end['solved']}/{len(end_to_end['runs'])} solved)")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    rows = compare(baseline, current, args.threshold)
+    for name, old, new, ratio, regression in rows:
+        print(f"{name:45s} {old:>16,.0f} {new:>16,.0f} {ratio:>7.2f}x{'  REGRESSION' if regression else ''}")
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import abc
+import atexit
+import csv
+import io
+import os
+import sqlite3
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows, appends are still written with a single call
+    fcntl = None
+
+# Logs are written next to main.py by default, whatever the working directory is.
+default_log_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LogSink(abc.ABC):
+    def __init__(self, flush_interval=5.0, buffer_size=1000):
+        """
+        Initializes a buffered sink for the solver logs.
+
+        Rows are kept in memory per table and written in one batch when `buffer_size` rows are waiting, when the oldest
+        waiting row is older than `flush_interval` seconds (checked on every write), on `flush` and at interpreter exit.
+        A process forked from the owner of a sink starts with an empty buffer, so rows are never written twice.
+
+        Args:
+            flush_interval (float): Maximum age of a buffered row in seconds before the next write flushes it.
+            buffer_size (int): Number of buffered rows that triggers a flush.
+
+        Attributes:
+            flush_interval (float): Maximum age of a buffered row in seconds.
+            buffer_size (int): Number of buffered rows that triggers a flush.
+            buffers (dict): Buffered rows, as (columns, rows) per table name.
+        """
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.buffers = {}
+        self._pending = 0
+        self._oldest = None
+        self._pid = os.getpid()
+        atexit.register(self.flush)
+
+    def write(self, table, columns, row):
+        """
+        Buffers one row.
+
+        Args:
+            table (str): Name of the log, such as "execution_log".
+            columns (list): Column names, the same for every row of a table.
+            row (list): Values aligned with `columns`.
+        """
+        self._check_process()
+        self.buffers.setdefault(table, (columns, []))[1].append(row)
+        self._pending += 1
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if self._pending >= self.buffer_size or time.monotonic() - self._oldest >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._check_process()
+        for table, (columns, rows) in self.buffers.items():
+            if rows:
+                self._write_rows(table, columns, rows)
+        self.buffers = {}
+        self._pending = 0
+        self._oldest = None
+
+    def _check_process(self):
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self.buffers = {}
+            self._pending = 0
+            self._oldest = None
+            self._reset()
+
+    def _reset(self):
+        """Drops per-process resources, such as open connections, after a fork."""
+
+    @abc.abstractmethod
+    def _write_rows(self, table, columns, rows):
+        """
+        Writes a batch of rows of one table, implemented by every backend.
+
+        Args:
+            table (str): Name of the log.
+            columns (list): Column names.
+            rows (list): Rows aligned with `columns`.
+        """
+
+
+class CsvSink(LogSink):
+    def __init__(self, directory=None, flush_interval=5.0, buffer_size=1000):
+        """
+        Initializes a sink writing every table to `<directory>/<table>.csv`.
+
+        A batch is appended with a single write while holding an exclusive lock on the file (where `fcntl` is
+        available), so several processes can share the files. The header is written when the file is created; the
+        header of a file written by an older version, whose columns are a prefix of the new ones, is extended in place
+        and its old rows keep their shorter length.
+
+        Args:
+            directory (str, optional): Directory of the CSV files, `default_log_dir` when omitted.
+            flush_interval (float): See `LogSink`.
+            buffer_size (int): See `LogSink`.
+
+        Attributes:
+            directory (str): Directory of the CSV files.
+        """
+        super().__init__(flush_interval, buffer_size)
+        self.directory = directory or default_log_dir
+
+    def _write_rows(self, table, columns, rows):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{table}.csv"), mode='a+', newline='') as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                lines = file.readlines(1)
+                line_end = lines[0][len(lines[0].rstrip('\r\n')):] if lines else '\r\n'
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator=line_end or '\r\n')
+                header = next(csv.reader(lines), [])
+                if not lines:
+                    writer.writerow(columns)
+                elif header != columns and columns[:len(header)] == header:
+                    self._extend_header(file, columns, line_end or '\r\n')
+                writer.writerows(rows)
+                file.seek(0, os.SEEK_END)
+                file.write(buffer.getvalue())
+                file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _extend_header(file, columns, line_end):
+        file.seek(0)
+        lines = file.readlines()
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator=line_end).writerow(columns)
+        lines[0] = buffer.getvalue()
+        file.seek(0)
+        file.truncate()
+        file.writelines(lines)
+
+
+class SqliteSink(LogSink):
+    def __init__(self, path=None, flush_interval=5.0, buffer_size=1000):
+        """
+        Initializes a sink writing every table to a table of the same name in an SQLite database.
+
+        A batch is inserted with `executemany` in a single transaction. SQLite locks the database while writing, so
+        several processes can share it; every process opens its own connection. Columns missing from an existing table
+        are added.
+
+        Args:
+            path (str, optional): Path of the database, `<default_log_dir>/logs.sqlite3` when omitted.
+            flush_interval (float): See `LogSink`.
+            buffer_size (int): See `LogSink`.
+
+        Attributes:
+            path (str): Path of the database.
+        """
+        super().__init__(flush_interval, buffer_size)
+        self.path = path or os.path.join(default_log_dir, "logs.sqlite3")
+        self._connection = None
+        self._tables = {}
+
+    def _reset(self):
+        self._connection = None
+        self._tables = {}
+
+    def _write_rows(self, table, columns, rows):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=60)
+        with self._connection:
+            if self._tables.get(table) != columns:
+                self._connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({", ".join(columns)})')
+                existing = [info[1] for info in self._connection.execute(f'PRAGMA table_info("{table}")')]
+                for column in columns:
+                    if column not in existing:
+                        self._connection.execute(f'ALTER TABLE "{table}" ADD COLUMN {column}')
+                self._tables[table] = columns
+            self._connection.executemany(
+                f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})', rows)
+
+
+sink_types = {"csv": CsvSink, "sqlite": SqliteSink}
+_sinks = {}
+
+
+def open_sink(backend="csv", path=None, flush_interval=5.0, buffer_size=1000):
+    """
+    Returns the sink of a backend and path, creating it on first use.
+
+    Solvers that log to the same place share one sink per process, so a run with thousands of solves keeps a single
+    buffer and a single at-exit flush.
+
+    Args:
+        backend (str): "csv" or "sqlite".
+        path (str, optional): Directory of the CSV files or path of the SQLite database, see the sink classes.
+        flush_interval (float): See `LogSink`.
+        buffer_size (int): See `LogSink`.
+
+    Returns:
+        LogSink: The shared sink.
+    """
+    key = (backend, os.path.abspath(path) if path else None)
+    if key not in _sinks:
+        _sinks[key] = sink_types[backend](path, flush_interval, buffer_size)
+    return _sinks[key]
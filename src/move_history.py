@@ -0,0 +1,62 @@
+class MoveHistory:
+    __slots__ = ('parent', 'codes', 'length')
+
+    def __init__(self, parent=None, codes=()):
+        """
+        Initializes an immutable move history node.
+
+        A history is a chain of chunks: each node holds the opcodes (see `permutation_table.opcodes`) added in one step
+        and a pointer to the history it extends. Appending never changes a node, it creates a new one, so any number of
+        cube copies can share their common prefix and copying a history is free. The chain is only walked when the
+        history is iterated, which `translate_moves` does when a solution is reported.
+
+        Args:
+            parent (MoveHistory, optional): The history this node extends, None for the empty history.
+            codes (tuple): The opcodes added by this node.
+
+        Attributes:
+            parent (MoveHistory): The history this node extends.
+            codes (tuple): The opcodes added by this node.
+            length (int): The total number of tokens in the history.
+        """
+        self.parent = parent
+        self.codes = codes
+        self.length = len(codes) + (parent.length if parent is not None else 0)
+
+    def push(self, codes):
+        """
+        Returns a new history extended with the given opcodes.
+
+        Args:
+            codes (iterable of int): Opcodes to append, in order.
+
+        Returns:
+            MoveHistory: The extended history, or this history when there is nothing to append.
+        """
+        codes = tuple(codes)
+        if not codes:
+            return self
+        return MoveHistory(self, codes)
+
+    def to_codes(self):
+        """
+        Collects the opcodes of the whole chain.
+
+        Returns:
+            list: All opcodes from the oldest to the newest.
+        """
+        chunks = []
+        node = self
+        while node is not None:
+            chunks.append(node.codes)
+            node = node.parent
+        return [code for chunk in reversed(chunks) for code in chunk]
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.to_codes())
+
+
+empty_history = MoveHistory()
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+from hyperopt import hp, tpe, Trials, STATUS_OK, JOB_STATE_DONE, space_eval
+from hyperopt.base import Domain
+
+from .logsink import default_log_dir
+from .rubikscube import RubiksCube
+from .solver import BeesAlgorithm
+
+search_space = {
+    'initial_population_size': hp.choice('initial_population_size', range(2, 150)),
+    'num_scouts': hp.choice('num_scouts', range(2, 150)),
+    'num_local_searches': hp.choice('num_local_searches', range(2, 150))
+}
+
+# Number of finished trials needed before the median stopping rule starts pruning.
+min_reference_trials = 3
+
+
+class TrialStore:
+    def __init__(self, path):
+        """
+        Initializes an append-only store of finished trials, kept as one JSON object per line.
+
+        Every record holds the solver parameters, the hyperopt values they were drawn from, the result and the key of
+        the corpus they were scored on, so a later run on the same corpus can reuse them. Records of other corpora are
+        kept in the same file and ignored.
+
+        Args:
+            path (str): Path of the JSONL file, created on the first write. A relative path is taken relative to
+                        `default_log_dir`, so the trials are stored next to the logs whatever the working directory is.
+
+        Attributes:
+            path (str): Absolute path of the JSONL file.
+        """
+        self.path = os.path.join(default_log_dir, path)
+
+    @staticmethod
+    def corpus_key(corpus, max_iterations):
+        """
+        Returns a short key identifying a corpus together with the iteration limit, as both change the losses.
+        """
+        return hashlib.sha1(json.dumps([corpus, max_iterations]).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def params_key(params):
+        return json.dumps(params, sort_keys=True)
+
+    def load(self, corpus_key):
+        """
+        Reads the records of one corpus.
+
+        Args:
+            corpus_key (str): The value returned by `corpus_key`.
+
+        Returns:
+            dict: The records, keyed by `params_key` of their parameters. Later records win.
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path) as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record['corpus'] == corpus_key:
+                    records[self.params_key(record['params'])] = record
+        return records
+
+    def append(self, record):
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(record) + "\n")
+
+
+def median_score(curves, iteration):
+    """
+    Returns the median best-so-far score of finished trials at a given iteration.
+
+    A curve that ended before `iteration` (because its solve succeeded) keeps its last value.
+
+    Args:
+        curves (list): Best-so-far score curves of finished trials on one scramble.
+        iteration (int): The iteration to compare at.
+
+    Returns:
+        float: The median score, or infinity while there are fewer than `min_reference_trials` curves.
+    """
+    values = [curve[min(iteration, len(curve) - 1)] for curve in curves if curve]
+    if len(values) < min_reference_trials:
+        return float('inf')
+    return float(np.median(values))
+
+
+def objective(params, corpus, max_iterations, reference_curves=None, prune_after=None, timeout=None):
+    """
+    Scores one set of solver parameters on every scramble of a corpus.
+
+    The loss of a scramble is its solving time in seconds, doubled when the solver hits `max_iterations`, as
+    `BeesAlgorithm.run_solver` does. Averaging over a fixed corpus makes trials comparable with each other.
+
+    The best-so-far score of every iteration is recorded as a curve. A trial is stopped early when, after `prune_after`
+    iterations, its curve is worse than the median of the finished trials at the same iteration on the same scramble
+    (median stopping rule), or when it runs past its `timeout`. The remaining scrambles are then skipped and the
+    interrupted solve is charged as a failed run at its current pace, i.e. the time it would need to reach
+    `max_iterations`, doubled.
+
+    Args:
+        params (dict): Keyword arguments for `BeesAlgorithm` (see `search_space`).
+        corpus (list): Scrambles to solve.
+        max_iterations (int): Iteration limit of every solve.
+        reference_curves (list, optional): For every scramble, the curves of finished trials to compare against.
+        prune_after (int, optional): First iteration at which the median stopping rule applies, None disables it.
+        timeout (float, optional): Wall-clock budget of the whole trial in seconds, enforced through the solver's
+                                   time budget so a solve stops within one round of algorithms.
+
+    Returns:
+        dict: The hyperopt result, with the mean loss, the loss and the score curve of every solved scramble, and
+              `pruned` set to "median" or "timeout" when the trial was stopped early.
+    """
+    reference_curves = reference_curves or [[] for _ in corpus]
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    losses, curves = [], []
+    pruned = None
+    for index, scramble in enumerate(corpus):
+        solver = BeesAlgorithm(RubiksCube(scramble), max_iterations=max_iterations, **params)
+        solver.set_verbosity("quiet")
+        if deadline is not None:
+            solver.set_budget(time_limit=max(0.0, deadline - time.perf_counter()))
+        stop_event = threading.Event()
+        curve = []
+
+        def on_iteration(iteration, score, corner_score, edge_score):
+            nonlocal pruned
+            curve.append(int(min(score, curve[-1])) if curve else int(score))
+            if score != 0 and prune_after is not None and iteration >= prune_after and \
+                    curve[-1] > median_score(reference_curves[index], iteration):
+                pruned = "median"
+                stop_event.set()
+
+        start = time.perf_counter()
+        solver.run_solver(threading.Lock(), stop_event, on_iteration=on_iteration)
+        elapsed = time.perf_counter() - start
+        curves.append(curve)
+        if solver.stop_reason == "time_limit":
+            pruned = "timeout"
+        if pruned:
+            losses.append(elapsed * (max_iterations + 1) / max(len(curve), 1) * 2)
+            break
+        losses.append(elapsed if solver.solution else elapsed * 2)
+    return {'loss': float(np.mean(losses)), 'status': STATUS_OK, 'losses': losses, 'curves': curves, 'pruned': pruned}
+
+
+def optimise(corpus, max_evals=200, num_workers=1, max_iterations=200, seed=None, trials=None, prune_after=None,
+             trial_timeout=None, store=None):
+    """
+    Runs a TPE search over `search_space` with several trials evaluated at the same time.
+
+    hyperopt's `fmin` evaluates one trial after the other. This loop asks TPE for a new trial whenever a worker
+    process is free and reports results back as soon as they arrive, so up to `num_workers` trials are always running.
+    TPE takes the trials that are still running into account when suggesting new ones.
+
+    Every new trial gets the score curves of the trials finished so far, which `objective` uses to prune it once it
+    falls behind their median (see `objective`). Pruned trials are not used as references.
+
+    With a `store`, the trials it holds for the same corpus and iteration limit are loaded first, so TPE starts from
+    everything evaluated before, and every finished trial is appended to it. When TPE suggests parameters that are
+    already in the store, the stored result is reused instead of evaluating them again. Such trials still count
+    towards `max_evals`, which keeps the run finite once the search has converged.
+
+    Args:
+        corpus (list): Scrambles every trial is scored on (see `make_corpus`).
+        max_evals (int): Total number of trials.
+        num_workers (int): Number of trials evaluated concurrently, each in its own process.
+        max_iterations (int): Iteration limit of every solve.
+        seed (int, optional): Seed of the TPE suggestions.
+        trials (Trials, optional): Trials to continue from, a new object is created when omitted.
+        prune_after (int, optional): First iteration at which bad trials may be pruned, None disables pruning.
+        trial_timeout (float, optional): Wall-clock budget of a single trial in seconds, None for no limit.
+        store (TrialStore, optional): Store to warm-start from and to save the finished trials to.
+
+    Returns:
+        Trials: All evaluated trials, including the ones loaded from the store.
+    """
+    trials = trials if trials is not None else Trials()
+    domain = Domain(objective, search_space)
+    rstate = np.random.default_rng(seed)
+    corpus_key = TrialStore.corpus_key(corpus, max_iterations)
+    stored = store.load(corpus_key) if store is not None else {}
+    for record in stored.values():
+        _insert_done_trial(trials, domain, record['vals'], record['result'])
+    max_evals += len(trials.trials)
+
+    reference_curves = [[] for _ in corpus]
+    for doc in trials.trials:
+        _add_reference(reference_curves, doc.get('result', {}))
+
+    running = {}
+    with ProcessPoolExecutor(num_workers) as executor:
+        while running or len(trials.trials) < max_evals:
+            while len(running) < num_workers and len(trials.trials) < max_evals:
+                new_ids = trials.new_trial_ids(1)
+                trials.refresh()
+                trials.insert_trial_docs(tpe.suggest(new_ids, domain, trials, rstate.integers(2 ** 31 - 1)))
+                trials.refresh()
+                doc = next(doc for doc in trials.trials if doc['tid'] == new_ids[0])
+                vals = {key: int(values[0]) for key, values in doc['misc']['vals'].items() if values}
+                params = space_eval(search_space, vals)
+                record = stored.get(TrialStore.params_key(params))
+                if record is not None:
+                    doc['result'] = record['result']
+                    doc['state'] = JOB_STATE_DONE
+                    trials.refresh()
+                    continue
+                future = executor.submit(objective, params, corpus, max_iterations, reference_curves, prune_after,
+                                         trial_timeout)
+                running[future] = (doc, vals, params)
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                doc, vals, params = running.pop(future)
+                doc['result'] = future.result()
+                doc['state'] = JOB_STATE_DONE
+                _add_reference(reference_curves, doc['result'])
+                record = {'corpus': corpus_key, 'params': params, 'vals': vals, 'result': doc['result']}
+                stored[TrialStore.params_key(params)] = record
+                if store is not None:
+                    store.append(record)
+            trials.refresh()
+    return trials
+
+
+def _insert_done_trial(trials, domain, vals, result):
+    tid, = trials.new_trial_ids(1)
+    misc = {'tid': tid, 'cmd': domain.cmd, 'workdir': domain.workdir,
+            'idxs': {key: [tid] for key in vals}, 'vals': {key: [value] for key, value in vals.items()}}
+    doc, = trials.new_trial_docs([tid], [None], [result], [misc])
+    doc['state'] = JOB_STATE_DONE
+    trials.insert_trial_docs([doc])
+    trials.refresh()
+
+
+def _add_reference(reference_curves, result):
+    if result.get('curves') and not result.get('pruned'):
+        for curves, curve in zip(reference_curves, result['curves']):
+            curves.append(curve)
+
+
+def best_params(trials):
+    """
+    Returns the solver parameters of the best trial, as keyword arguments for `BeesAlgorithm`.
+    """
+    return space_eval(search_space, trials.argmin)
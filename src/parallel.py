@@ -0,0 +1,98 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from .move_history import empty_history
+from .population import Population
+from .rubikscube import RubiksCube
+
+
+def _run_chunk(task):
+    """
+    Runs a search kernel on one slice of a population inside a worker process.
+
+    Only the raw sticker rows travel to the worker, and only the resulting rows and the opcodes added to each row come
+    back, so no cube objects or histories are pickled. The population and the shared `RubiksCube.sampler` of the
+    worker both get streams derived from the slice's seed, so no two slices draw the same values.
+
+    Args:
+        task (tuple): The kernel, the (n, 54) uint8 states, the seed of the slice, the extra positional and keyword
+                      arguments of the kernel and the deadline (a `time.time` value, or None). With a deadline, the
+                      kernel gets a `cancelled` check that turns True once the deadline has passed.
+
+    Returns:
+        tuple: The resulting states, for each row the list of opcodes the kernel appended to its history, and the work
+               counters of the kernel (see `Population.counter_info`).
+    """
+    kernel, states, seed, args, kwargs, deadline = task
+    Population.reset_counter_info()
+    RubiksCube.seed_sampler(seed.spawn(1)[0])
+    population = Population(states, [empty_history] * len(states), rng=np.random.default_rng(seed))
+    if deadline is not None:
+        kwargs = dict(kwargs, cancelled=lambda: time.time() >= deadline)
+    result = kernel(population, *args, **kwargs)
+    return result.states, [history.to_codes() for history in result.histories], Population.counter_info()
+
+
+class SearchPool:
+    def __init__(self, num_workers, seed=None):
+        """
+        Initializes a pool of worker processes that run the search kernels of `search` on slices of a population.
+
+        Every call splits the population into one slice per worker. Each slice gets its own random stream, spawned from
+        one `np.random.SeedSequence`, so a run with a fixed seed gives the same results no matter which process picks up
+        which slice.
+
+        Args:
+            num_workers (int): Number of worker processes.
+            seed (int, optional): Seed of the random streams, fresh entropy when omitted.
+
+        Attributes:
+            num_workers (int): Number of worker processes.
+            seed_sequence (np.random.SeedSequence): Source of the per-slice random streams.
+            pool (multiprocessing.pool.Pool): The worker processes, started on first use.
+        """
+        self.num_workers = num_workers
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.pool = None
+
+    def map(self, kernel, population, *args, deadline=None, **kwargs):
+        """
+        Runs a search kernel over a population, one slice per worker.
+
+        A threading event cannot be shared with the workers, so they are stopped by a deadline instead: every worker
+        passes the kernel a `cancelled` check comparing the wall clock with it.
+
+        Args:
+            kernel (function): A module-level function taking a population, `args` and `kwargs` and returning a
+                               population with the same number of rows, such as `search.local_search`. With a
+                               deadline, it must also accept a `cancelled` keyword argument.
+            population (Population): The population to process. It is not modified.
+            *args: Extra arguments passed to the kernel.
+            deadline (float, optional): Wall-clock time, as returned by `time.time`, after which the kernels skip their
+                                        remaining rounds of algorithms.
+            **kwargs: Extra keyword arguments passed to the kernel.
+
+        Returns:
+            Population: The rows returned by the workers, in the original order, with their histories extended.
+        """
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.num_workers)
+        slices = [rows for rows in np.array_split(np.arange(len(population)), self.num_workers) if len(rows)]
+        seeds = self.seed_sequence.spawn(len(slices))
+        tasks = [(kernel, population.states[rows], seed, args, kwargs, deadline) for rows, seed in zip(slices, seeds)]
+        results = self.pool.map(_run_chunk, tasks)
+
+        for _, _, counters in results:
+            Population.add_counter_info(counters)
+        states = np.concatenate([states for states, _, _ in results])
+        codes = [row_codes for _, chunk_codes, _ in results for row_codes in chunk_codes]
+        histories = [history.push(row_codes) for history, row_codes in zip(population.histories, codes)]
+        return Population(states, histories, population.scramble, population.rng)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
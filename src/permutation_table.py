@@ -1,3 +1,5 @@
+import random
+
 corner_perms = ["F R U' R' U' R U R' F' R U R' U' R' F R F'",
                 "R U R' U' R' F R2 U' R' U' R U R' F'",
                 "x L2 D2 L' U' L D2 L' U L'",
@@ -22,35 +24,54 @@ moves = ['F', 'R', 'U', 'B', 'L', 'D', 'M', 'E', 'S', 'x', 'y', 'z']
 directions = ['', "'", '2']
 viable_moves = [move + direction for move in moves for direction in directions]
 
+# Opcodes are the small integers used everywhere inside the solver to name what can be applied to a cube: the viable
+# moves come first, followed by the edge and corner algorithms ("<index>_Edges" / "<index>_Corners" in a move history).
+# Text is only parsed when a scramble comes in (`parse_moves`) and produced when a solution goes out (`translate_moves`).
+opcode_names = (viable_moves + [f"{index}_Edges" for index in range(len(edge_perms))] +
+                [f"{index}_Corners" for index in range(len(corner_perms))])
+opcodes = {name: opcode for opcode, name in enumerate(opcode_names)}
+move_opcodes = list(range(len(viable_moves)))
+edge_opcodes = [opcodes[f"{index}_Edges"] for index in range(len(edge_perms))]
+corner_opcodes = [opcodes[f"{index}_Corners"] for index in range(len(corner_perms))]
+
+
+def parse_moves(moves):
+    """
+    Parses moves in standard notation into opcodes.
+
+    Args:
+        moves (str): Moves separated by spaces (e.g., "R U R' U'"). Unknown notation, such as the empty string of an
+                     empty scramble, is skipped.
+
+    Returns:
+        list: The opcodes of the moves, in order.
+    """
+    return [opcodes[move] for move in moves.split() if move in opcodes]
+
 
 def translate_moves(move_history):
     """
     Translates a sequence of indexed or shorthand moves into standard Rubik's Cube notation.
 
-    This method processes a list of move entries where each move can be either a direct cube move notation or an index
+    This method processes a sequence of move entries where each move can be either a direct cube move or an index
     pointing to predefined complex permutations for corners and edges. The complex permutations are indexed to simplify
-    notation and stored in predefined lists (`corner_perms` and `edge_perms`).
+    notation and stored in predefined lists (`corner_perms` and `edge_perms`), and expanded through `alg_moves`.
 
     Args:
-        move_history (list of str): A list containing move notations and indices. Indices are expected to be prefixed with
-                                    'Corners' or 'Edges' to indicate which set of predefined permutations to use.
+        move_history (iterable): Opcodes, for example a `MoveHistory`. Tokens in text form ("R'", "3_Corners") are
+                                 accepted as well.
 
     Returns:
-        string: String where each substring seperated by a space is a move in standard Rubik's Cube notation. This expanded list translates
-              complex indexed moves into a sequence of basic moves as defined in the `corner_perms` and `edge_perms` arrays.
+        list: Each element is a move in standard Rubik's Cube notation. This expanded list translates complex indexed
+              moves into a sequence of basic moves as defined in the `corner_perms` and `edge_perms` arrays.
 
     """
     translated_moves = []
     for move in move_history:
-        if 'Corners' in move:
-            index = int(move.split('_')[0])
-            translated_moves.append(corner_perms[index])
-        elif 'Edges' in move:
-            index = int(move.split('_')[0])
-            translated_moves.append(edge_perms[index])
-        else:
-            translated_moves.append(move)
-    return " ".join(translated_moves).split(" ")
+        opcode = opcodes.get(move) if isinstance(move, str) else move
+        if opcode is not None:
+            translated_moves.extend(alg_moves.get(opcode, (opcode,)))
+    return [opcode_names[opcode] for opcode in translated_moves]
 
 
 def reverse_moves(moves):
@@ -80,3 +101,93 @@ def reverse_moves(moves):
         else:
             inverted_moves.append(move + "'")
     return ' '.join(inverted_moves)
+
+
+# The inverse opcode of every viable move and the move opcodes of every algorithm, parsed once at import.
+inverse_opcodes = [opcodes[reverse_moves(move)] for move in viable_moves]
+alg_moves = {opcode: parse_moves(alg) for opcode, alg in zip(edge_opcodes + corner_opcodes, edge_perms + corner_perms)}
+
+
+# The three layers of every axis, in the order a setup turns them. Whole-cube rotations are left out: x, y and z are
+# the products of three commuting layers (x = R M' L'), so conjugating with a rotation is already covered by the layer
+# moves.
+axis_layers = [['L', 'M', 'R'], ['U', 'E', 'D'], ['F', 'S', 'B']]
+setup_opcodes = [opcodes[layer + direction] for layers in axis_layers for layer in layers for direction in directions]
+_layer_order = {layer: index for index, layer in enumerate(layer for layers in axis_layers for layer in layers)}
+_layer_axis = {layer: axis for axis, layers in enumerate(axis_layers) for layer in layers}
+
+
+def setup_moves_commute(first, second):
+    """
+    Tells whether two setup moves commute: any two turns of the same axis do, and so do half turns of two slices
+    ("M2 E2" is "E2 M2"). No other pair of layer turns commutes.
+
+    Args:
+        first (int): Opcode of a setup move.
+        second (int): Opcode of a setup move.
+
+    Returns:
+        bool: Whether applying the moves in either order gives the same permutation.
+    """
+    first, second = opcode_names[first], opcode_names[second]
+    return (_layer_axis[first[0]] == _layer_axis[second[0]] or
+            (first[0] in 'MES' and second[0] in 'MES' and first.endswith('2') and second.endswith('2')))
+
+
+def _build_setup_successors():
+    """
+    Builds the automaton of canonical setup sequences.
+
+    Turns that commute can be written in any order, and two turns of the same layer with only commuting turns between
+    them merge into one. The canonical spelling is the one in which no move could be moved, past commuting moves only,
+    in front of a move of a later layer (in the order of `axis_layers`) or next to a turn of its own layer. This rules
+    out cancellations ("R R'"), repeated turns ("R R", "R L R"), reordered commuting turns ("R L" once "L R" is allowed,
+    "E2 M2" once "M2 E2" is) and longer reorderings such as "E2 L M2", which is "M2 E2 L". Other identities of the
+    cube group, such as "(R2 U2) * 6" being no move at all, are not taken into account.
+
+    A state is the set of moves that may not come next. Appending a move blocks every move it commutes with that
+    belongs to the same or an earlier layer, keeps the blocks of the moves it commutes with and lifts the others.
+
+    Returns:
+        list: For every state, starting with the state of the empty setup, a dict from each allowed opcode to the
+              index of the next state.
+    """
+    states = {frozenset(): 0}
+    successors = []
+    pending = [frozenset()]
+    while pending:
+        blocked = pending.pop(0)
+        transitions = {}
+        for move in setup_opcodes:
+            if move in blocked:
+                continue
+            order = _layer_order[opcode_names[move][0]]
+            following = frozenset(
+                other for other in setup_opcodes
+                if setup_moves_commute(move, other) and
+                (other in blocked or _layer_order[opcode_names[other][0]] <= order))
+            if following not in states:
+                states[following] = len(states)
+                pending.append(following)
+            transitions[move] = states[following]
+        successors.append(transitions)
+    return successors
+
+
+setup_successors = _build_setup_successors()
+
+
+def make_corpus(size, scramble_moves_count, seed):
+    """
+    Generates a fixed corpus of random scrambles.
+
+    Args:
+        size (int): Number of scrambles.
+        scramble_moves_count (int): Number of moves in each scramble.
+        seed (int): Seed of the generator, the same seed always gives the same corpus.
+
+    Returns:
+        list: The scrambles as strings of moves.
+    """
+    generator = random.Random(seed)
+    return [" ".join(generator.choices(viable_moves, k=scramble_moves_count)) for _ in range(size)]
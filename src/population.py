@@ -0,0 +1,399 @@
+import numpy as np
+
+from .permutation_table import edge_opcodes, corner_opcodes, inverse_opcodes
+from .rubikscube import RubiksCube, opcode_permutations, score_states, hash_states, solved_state
+from .sampling import max_setup_length, sample_setups
+
+# Opcode tables as arrays, so a different move or algorithm can be looked up and gathered for every row at once.
+inverse_move = np.array(inverse_opcodes)
+alg_opcodes = {"Edges": np.array(edge_opcodes), "Corners": np.array(corner_opcodes)}
+# Width of a row of the sticker matrices, the length of `RubiksCube.state`.
+sticker_count = solved_state.size
+# The opcode permutations as uint8 (every index is below 54), an eighth of the memory traffic of the intp originals.
+permutation_rows = opcode_permutations.astype(np.uint8)
+
+
+class Population:
+    # Work counters summed over all populations of the process, see `counter_info`.
+    moves_applied = 0
+    rows_copied = 0
+    rows_scored = 0
+    candidates_accepted = 0
+
+    def __init__(self, states, histories, scramble="", rng=None, buffer=None):
+        """
+        Initializes a population of cubes stored as rows of a single sticker matrix.
+
+        Every row of `states` has the same layout as `RubiksCube.state`, so moves and algorithms can be applied to many
+        cubes at once by gathering a different permutation for each row. Move histories are kept per row as immutable
+        `MoveHistory` chains, so rows created by `take` or `repeat` share them and recording only adds a new node.
+
+        Args:
+            states (np.ndarray): A (N, 54) uint8 matrix with one cube per row.
+            histories (list): N move histories, one `MoveHistory` per row.
+            scramble (str): The scramble shared by all cubes, used when rows are turned back into `RubiksCube` objects.
+            rng (np.random.Generator, optional): Random generator used for the random algorithms. A fresh one is
+                                                 created when omitted.
+            buffer (np.ndarray, optional): Preallocated matrix whose leading rows are `states`, so `extend` can grow the
+                                           population in place (see `StateArena`).
+
+        Attributes:
+            states (np.ndarray): The sticker matrix of the population.
+            histories (list): The move history of each row.
+            scramble (str): The scramble of the source cube.
+            rng (np.random.Generator): Random generator shared with populations derived from this one.
+            buffer (np.ndarray): The preallocated matrix holding `states`, None when `states` is a standalone array.
+        """
+        self.states = states
+        self.histories = histories
+        self.scramble = scramble
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.buffer = buffer
+
+    @classmethod
+    def from_cubes(cls, cubes, rng=None, out=None):
+        """
+        Creates a population from a list of cubes.
+
+        Args:
+            cubes (list): `RubiksCube` instances, all created from the same scramble.
+            rng (np.random.Generator, optional): Random generator of the new population.
+            out (np.ndarray, optional): Preallocated matrix to write the rows to, see `take`.
+
+        Returns:
+            Population: A population with one row per cube, sharing the cubes' histories.
+        """
+        histories = [cube.move_history for cube in cubes]
+        if out is not None and len(cubes) <= len(out):
+            states = np.stack([cube.state for cube in cubes], out=out[:len(cubes)])
+        else:
+            states, out = np.stack([cube.state for cube in cubes]), None
+        return cls(states, histories, cubes[0].scramble if cubes else "", rng, out)
+
+    @classmethod
+    def counter_info(cls):
+        """
+        Returns the work counters of all populations since the start or the last `reset_counter_info` call.
+
+        Returns:
+            dict: The number of moves or algorithms applied to a row ('moves'), rows copied ('copies'), rows scored
+                  ('scores') and local search candidates that replaced their bee ('accepted').
+        """
+        return {'moves': cls.moves_applied, 'copies': cls.rows_copied, 'scores': cls.rows_scored,
+                'accepted': cls.candidates_accepted}
+
+    @classmethod
+    def reset_counter_info(cls):
+        cls.moves_applied = 0
+        cls.rows_copied = 0
+        cls.rows_scored = 0
+        cls.candidates_accepted = 0
+
+    @classmethod
+    def add_counter_info(cls, info):
+        """
+        Adds counters returned by `counter_info`, for example those of a worker process.
+        """
+        cls.moves_applied += info['moves']
+        cls.rows_copied += info['copies']
+        cls.rows_scored += info['scores']
+        cls.candidates_accepted += info['accepted']
+
+    def __len__(self):
+        return len(self.states)
+
+    def to_cube(self, row):
+        """
+        Materialises a single row as a standalone `RubiksCube`.
+
+        The cube is loaded with `load_state`, so its first `get_score` checks every slot.
+
+        Args:
+            row (int): Index of the row.
+
+        Returns:
+            RubiksCube: A cube holding a copy of the row's stickers and sharing its move history.
+        """
+        cube = RubiksCube(self.scramble)
+        cube.load_state(self.states[row].copy())
+        cube.move_history = self.histories[row]
+        return cube
+
+    def to_cubes(self, rows=None):
+        rows = range(len(self)) if rows is None else rows
+        return [self.to_cube(row) for row in rows]
+
+    def take(self, rows, out=None):
+        """
+        Returns a new population made of the given rows, in the given order.
+
+        Args:
+            rows (array-like): Row indices, duplicates allowed.
+            out (np.ndarray, optional): Preallocated matrix to write the rows to instead of allocating a new one. It must
+                                        not overlap this population's states; when it is too small, a new matrix is
+                                        allocated anyway.
+
+        Returns:
+            Population: The selected rows. Histories are shared with this population.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        Population.rows_copied += len(rows)
+        histories = [self.histories[row] for row in rows]
+        if out is not None and len(rows) <= len(out):
+            states = np.take(self.states, rows, axis=0, out=out[:len(rows)], mode='clip')
+            return Population(states, histories, self.scramble, self.rng, out)
+        return Population(self.states[rows], histories, self.scramble, self.rng)
+
+    def copy(self, out=None):
+        return self.take(np.arange(len(self)), out)
+
+    def repeat(self, count, out=None):
+        """
+        Returns a new population where every row is repeated `count` times in a row.
+
+        Row `i * count + j` of the result is the `j`-th copy of row `i`, which is how the local search lays out the
+        candidates of each bee.
+
+        Args:
+            count (int): Number of copies of each row.
+            out (np.ndarray, optional): Preallocated matrix to write the rows to, see `take`.
+
+        Returns:
+            Population: The repeated rows, sharing their histories with this population.
+        """
+        return self.take(np.repeat(np.arange(len(self)), count), out)
+
+    def extend(self, other):
+        """
+        Appends the rows of another population, in place when this population's buffer has room for them.
+        """
+        size = len(self) + len(other)
+        if self.buffer is not None and size <= len(self.buffer):
+            self.buffer[len(self):size] = other.states
+            self.states = self.buffer[:size]
+        else:
+            self.states = np.concatenate((self.states, other.states))
+            self.buffer = None
+        self.histories = self.histories + other.histories
+
+    def replace(self, rows, other, other_rows):
+        """
+        Overwrites some rows of this population with rows of another population.
+
+        Args:
+            rows (array-like): Rows of this population to overwrite.
+            other (Population): The population to copy from.
+            other_rows (array-like): Rows of `other`, aligned with `rows`.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        other_rows = np.asarray(other_rows, dtype=np.intp)
+        self.states[rows] = other.states[other_rows]
+        for row, other_row in zip(rows, other_rows):
+            self.histories[row] = other.histories[other_row]
+
+    def permute(self, rows, opcodes, arena=None):
+        """
+        Applies one opcode to each of the given rows without recording it in the histories.
+
+        The permutations are gathered as uint8 and the rows are permuted through one flat `np.take`, all into scratch
+        matrices, so with an arena the call allocates nothing of the size of the rows.
+
+        Args:
+            rows (np.ndarray): Row indices, without duplicates.
+            opcodes (np.ndarray): Opcodes, one for each row.
+            arena (StateArena, optional): Owner of the scratch matrices, which are allocated for the call when omitted.
+        """
+        if not len(rows):
+            return
+        Population.moves_applied += len(rows)
+        permutations, indices, states = (arena.gather_scratch(len(rows)) if arena is not None else
+                                         StateArena.new_gather_scratch(len(rows)))
+        np.take(permutation_rows, opcodes, axis=0, out=permutations, mode='clip')
+        np.add((rows * sticker_count)[:, None], permutations, out=indices)
+        np.take(self.states.reshape(-1), indices, out=states, mode='clip')
+        self.states[rows] = states
+
+    def make_alg(self, alg_name, move_counts, rows=None, record=True, cancelled=None, arena=None):
+        """
+        Applies the random algorithms of `RubiksCube.make_alg` to many rows at once.
+
+        Each row gets its own number of algorithms, its own canonical setup (see `sample_setups`) and its own algorithm
+        indices, but every step is a single gather over all rows that are still active, so the Python-level work does
+        not depend on the number of rows.
+
+        Args:
+            alg_name (str): One of "random_algs_edges", "random_algs_corners", "random_moves_algs_moves_prim_edges"
+                            or "random_moves_algs_moves_prim_corners", with the same meaning as in `RubiksCube.make_alg`.
+            move_counts (array-like): Number of algorithms to apply to each row (0 leaves the row untouched).
+            rows (np.ndarray, optional): Row indices aligned with `move_counts`, all rows when omitted.
+            record (bool): Whether to append the applied moves to the histories of the rows right away. Callers that
+                           only keep a few of the rows can pass False and call `record_history` for the survivors.
+            cancelled (function, optional): Called before every round, the first one included. When it returns
+                                            True, the remaining rounds are skipped; every row then holds only complete
+                                            algorithms, and the journal lists exactly the rounds that were applied.
+            arena (StateArena, optional): Owner of the scratch matrices of the gathers, see `permute`.
+
+        Returns:
+            list: A journal of the applied rounds, which can be passed to `record_history`.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.intp)
+        move_counts = np.asarray(move_counts)
+        # Sorted rows keep the active rows of every round sorted, so `record_history` can search them.
+        order = np.argsort(rows, kind='stable')
+        rows, move_counts = rows[order], move_counts[order]
+        algs_available = alg_opcodes["Edges" if alg_name.endswith("edges") else "Corners"]
+        with_setup = alg_name.startswith("random_moves_algs_moves_prim")
+
+        if with_setup:
+            # The setups of all rounds are drawn in one block, which keeps the per-round overhead down.
+            all_setups, all_lengths = sample_setups(self.rng, int(move_counts.sum()))
+        else:
+            all_setups = np.zeros((len(rows), max_setup_length), dtype=np.intp)
+            all_lengths = np.zeros(len(rows), dtype=np.intp)
+        drawn = 0
+
+        journal = []
+        for round_index in range(int(move_counts.max(initial=0))):
+            if cancelled is not None and cancelled():
+                break
+            active = rows[move_counts > round_index]
+            algs = algs_available[self.rng.integers(0, len(algs_available), size=len(active))]
+            if with_setup:
+                setups = all_setups[drawn:drawn + len(active)]
+                lengths = all_lengths[drawn:drawn + len(active)]
+                drawn += len(active)
+                for step in range(max_setup_length):
+                    selected = lengths > step
+                    self.permute(active[selected], setups[selected, step], arena)
+            else:
+                setups, lengths = all_setups[:len(active)], all_lengths[:len(active)]
+            self.permute(active, algs, arena)
+            if with_setup:
+                for step in reversed(range(max_setup_length)):
+                    selected = lengths > step
+                    self.permute(active[selected], inverse_move[setups[selected, step]], arena)
+
+            # Only the active rows are kept, in the increasing order of the rows.
+            journal.append((active, algs, lengths, setups))
+
+        if record:
+            self.record_history(journal, rows[move_counts > 0])
+        return journal
+
+    def record_history(self, journal, rows):
+        """
+        Appends the moves stored in a `make_alg` journal to the histories of the given rows.
+
+        The opcodes of the setup moves, of the algorithm and of the inverted setup are recorded the same way
+        `RubiksCube.make_alg` does, so `translate_moves` works on the result.
+
+        Args:
+            journal (list): The value returned by `make_alg`.
+            rows (array-like): Rows whose histories should be extended.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        codes = [[] for _ in rows]
+        for active, algs, lengths, setups in journal:
+            if not len(active):
+                continue
+            positions = np.minimum(np.searchsorted(active, rows), len(active) - 1)
+            for index in np.flatnonzero(active[positions] == rows).tolist():
+                position = positions[index]
+                setup = setups[position, :lengths[position]].tolist()
+                codes[index].extend(setup)
+                codes[index].append(int(algs[position]))
+                codes[index].extend(inverse_move[setup[::-1]].tolist())
+        for row, row_codes in zip(rows.tolist(), codes):
+            self.histories[row] = self.histories[row].push(row_codes)
+
+    def get_scores(self, rows=None):
+        """
+        Scores every row, or the given rows, in one call, see `score_states`.
+
+        Args:
+            rows (np.ndarray, optional): Row indices or a boolean mask, all rows when omitted.
+
+        Returns:
+            np.ndarray: A (N, 3) matrix with the total, edge and corner score of each row.
+        """
+        states = self.states if rows is None else self.states[rows]
+        Population.rows_scored += len(states)
+        return score_states(states)
+
+    def hashes(self):
+        """
+        Hashes every row, see `hash_states`.
+
+        Returns:
+            np.ndarray: The uint64 hash of each row.
+        """
+        return hash_states(self.states)
+
+    def unique_rows(self):
+        """
+        Finds the rows holding distinct states.
+
+        Returns:
+            np.ndarray: The index of the first row of every distinct state, in increasing order.
+        """
+        _, first = np.unique(self.hashes(), return_index=True)
+        return np.sort(first)
+
+
+class StateArena:
+    def __init__(self, initial_population_size, num_scouts, num_local_searches):
+        """
+        Initializes preallocated sticker matrices for the populations of one `BeesAlgorithm`.
+
+        An iteration of the solver copies the swarm for the local search, repeats it into the candidates, adds the
+        scouts and keeps the best half. These rows are written into matrices allocated once instead of new ones every
+        time. The gathers of the moves, which touch far more memory than the rows they write, use scratch matrices of
+        the arena as well (see `Population.permute`). What an iteration still allocates are the temporaries of scoring
+        and ranking the candidates, a few hundred bytes per candidate.
+
+        The swarm never grows beyond `max(initial_population_size, num_scouts)` rows, as every iteration keeps half of
+        it plus the scouts. It alternates between two matrices with room for the scouts: the local search copies it
+        into the spare one, the scouts are appended there and the survivors go back into the other one.
+
+        Args:
+            initial_population_size (int): Size of the swarm at the start and after a restart.
+            num_scouts (int): Number of scouts added by every global search.
+            num_local_searches (int): Number of candidates of every bee.
+
+        Attributes:
+            populations (tuple): The two matrices the swarm alternates between.
+            candidates (np.ndarray): The matrix of the local search candidates.
+            sources (np.ndarray): The matrix of the cubes the scouts start from.
+            scouts (np.ndarray): The matrix of the mutated scouts.
+            gather (tuple): The scratch matrices of the gathers of `Population.permute`, see `gather_scratch`.
+        """
+        capacity = max(initial_population_size, num_scouts)
+        self.populations = (np.empty((capacity + num_scouts, sticker_count), dtype=solved_state.dtype),
+                            np.empty((capacity + num_scouts, sticker_count), dtype=solved_state.dtype))
+        self.candidates = np.empty((capacity * num_local_searches, sticker_count), dtype=solved_state.dtype)
+        self.sources = np.empty((num_scouts, sticker_count), dtype=solved_state.dtype)
+        self.scouts = np.empty((num_scouts, sticker_count), dtype=solved_state.dtype)
+        self.gather = self.new_gather_scratch(max(capacity * num_local_searches, num_scouts))
+
+    @staticmethod
+    def new_gather_scratch(count):
+        """
+        Allocates the scratch matrices of `Population.permute` for `count` rows: the uint8 permutations, their flat
+        intp indices into the state matrix and the gathered stickers.
+        """
+        return (np.empty((count, sticker_count), dtype=np.uint8), np.empty((count, sticker_count), dtype=np.intp),
+                np.empty((count, sticker_count), dtype=solved_state.dtype))
+
+    def gather_scratch(self, count):
+        """
+        Returns the leading `count` rows of the scratch matrices of `Population.permute`, growing them when needed.
+        """
+        if count > len(self.gather[0]):
+            self.gather = self.new_gather_scratch(count)
+        return tuple(matrix[:count] for matrix in self.gather)
+
+    def spare(self, population):
+        """
+        Returns the population matrix that does not hold the rows of `population`, so they can be copied into it.
+        """
+        return self.populations[np.may_share_memory(population.states, self.populations[0])]
@@ -1,11 +1,386 @@
-import copy
-import random
-
 import numpy as np
-from .permutation_table import viable_moves, edge_perms, corner_perms, reverse_moves
+from .permutation_table import (viable_moves, opcodes, edge_opcodes, corner_opcodes, inverse_opcodes,
+                                alg_moves, parse_moves)
+from .move_history import empty_history
+from .sampling import MoveSampler
+
+# Order of the faces inside the flat sticker array. Face i occupies stickers 9 * i ... 9 * i + 8 in row-major order,
+# and its solved colour is i + 1, so the layout matches the numbering used by the original face dictionary.
+face_names = ['F', 'B', 'U', 'D', 'L', 'R']
+solved_state = np.repeat(np.arange(1, len(face_names) + 1, dtype=np.uint8), 9)
+
+
+def _quarter_turn(faces, face):
+    """
+    Applies a single clockwise turn to a dictionary of 3x3 face arrays.
+
+    This is the reference definition of the twelve base moves. It is only used at import time on a cube whose stickers
+    are labelled with their own index, which turns every move into an index permutation of the flat sticker array.
+
+    Args:
+        faces (dict): Face identifiers mapped to 3x3 numpy arrays, modified in place.
+        face (str): One of 'F', 'B', 'U', 'D', 'L', 'R', 'M', 'E', 'S', 'x', 'y', 'z'.
+    """
+    if face == "F":
+        faces["F"] = np.rot90(faces["F"], k=-1)
+        temp_top = np.copy(faces['U'][2, :])
+        temp_bottom = np.copy(faces['D'][0, :])
+        temp_left = np.copy(faces['L'][:, 2])
+        temp_right = np.copy(faces['R'][:, 0])
+
+        faces['U'][2, :] = temp_left[::-1]
+        faces['D'][0, :] = temp_right[::-1]
+        faces['L'][:, 2] = temp_bottom
+        faces['R'][:, 0] = temp_top
+    elif face == "D":
+        faces["D"] = np.rot90(faces["D"], k=-1)
+        temp_front = np.copy(faces['F'][2, :])
+        temp_left = np.copy(faces['L'][2, :])
+        temp_back = np.copy(faces['B'][2, :])
+        temp_right = np.copy(faces['R'][2, :])
+
+        faces['B'][2, :] = temp_right
+        faces['R'][2, :] = temp_front
+        faces['F'][2, :] = temp_left
+        faces['L'][2, :] = temp_back
+    elif face == "R":
+        faces["R"] = np.rot90(faces["R"], k=-1)
+        temp_front = np.copy(faces['F'][:, 2])
+        temp_up = np.copy(faces['U'][:, 2])
+        temp_down = np.copy(faces['D'][:, 2])
+        temp_back = np.copy(faces['B'][:, 0])
+
+        faces['F'][:, 2] = temp_down
+        faces['U'][:, 2] = temp_front
+        faces['D'][:, 2] = temp_back[::-1]
+        faces['B'][:, 0] = temp_up[::-1]
+    elif face == "L":
+        faces["L"] = np.rot90(faces["L"], k=-1)
+        temp_front = np.copy(faces['F'][:, 0])
+        temp_up = np.copy(faces['U'][:, 0])
+        temp_down = np.copy(faces['D'][:, 0])
+        temp_back = np.copy(faces['B'][:, 2])
+
+        faces['F'][:, 0] = temp_up
+        faces['U'][:, 0] = temp_back[::-1]
+        faces['D'][:, 0] = temp_front
+        faces['B'][:, 2] = temp_down[::-1]
+    elif face == "B":
+        faces["B"] = np.rot90(faces["B"], k=-1)
+        temp_top = np.copy(faces['U'][0, :])
+        temp_bottom = np.copy(faces['D'][2, :])
+        temp_left = np.copy(faces['L'][:, 0])
+        temp_right = np.copy(faces['R'][:, 2])
+
+        faces['U'][0, :] = temp_right
+        faces['D'][2, :] = temp_left
+        faces['L'][:, 0] = temp_top[::-1]
+        faces['R'][:, 2] = temp_bottom[::-1]
+    elif face == "U":
+        faces["U"] = np.rot90(faces["U"], k=-1)
+        temp_front = np.copy(faces['F'][0, :])
+        temp_left = np.copy(faces['L'][0, :])
+        temp_back = np.copy(faces['B'][0, :])
+        temp_right = np.copy(faces['R'][0, :])
+
+        faces['F'][0, :] = temp_right
+        faces['L'][0, :] = temp_front
+        faces['B'][0, :] = temp_left
+        faces['R'][0, :] = temp_back
+    elif face == "x":
+        faces["R"] = np.rot90(faces["R"], k=-1)
+        faces["L"] = np.rot90(faces["L"])
+        temp_front = np.copy(faces['F'])
+        temp_up = np.copy(faces['U'])
+        temp_down = np.copy(faces['D'])
+        temp_back = np.copy(faces['B'])
+
+        faces['F'] = temp_down
+        faces['U'] = temp_front
+        faces['D'] = np.rot90(temp_back, k=2)
+        faces['B'] = np.rot90(temp_up, k=2)
+    elif face == "M":
+        temp_front = np.copy(faces['F'])
+        temp_up = np.copy(faces['U'])
+        temp_down = np.copy(faces['D'])
+        temp_back = np.copy(faces['B'])
+
+        faces['F'][:, 1] = temp_up[:, 1]
+        faces['U'][:, 1] = np.rot90(temp_back, k=2)[:, 1]
+        faces['D'][:, 1] = temp_front[:, 1]
+        faces['B'][:, 1] = np.rot90(temp_down, k=2)[:, 1]
+    elif face == "y":
+        faces["U"] = np.rot90(faces["U"], k=-1)
+        faces["D"] = np.rot90(faces["D"])
+        temp_front = np.copy(faces['F'])
+        temp_left = np.copy(faces['L'])
+        temp_back = np.copy(faces['B'])
+        temp_right = np.copy(faces['R'])
+
+        faces['F'] = temp_right
+        faces['L'] = temp_front
+        faces['B'] = temp_left
+        faces['R'] = temp_back
+    elif face == "E":
+        temp_front = np.copy(faces['F'])
+        temp_left = np.copy(faces['L'])
+        temp_back = np.copy(faces['B'])
+        temp_right = np.copy(faces['R'])
+
+        faces['F'][1, :] = temp_left[1, :]
+        faces['L'][1, :] = temp_back[1, :]
+        faces['B'][1, :] = temp_right[1, :]
+        faces['R'][1, :] = temp_front[1, :]
+    elif face == "z":
+        faces["F"] = np.rot90(faces["F"], k=-1)
+        faces["B"] = np.rot90(faces["B"])
+        temp_top = np.copy(faces['U'])
+        temp_bottom = np.copy(faces['D'])
+        temp_left = np.copy(faces['L'])
+        temp_right = np.copy(faces['R'])
+
+        faces['U'] = np.rot90(temp_left, k=-1)
+        faces['D'] = np.rot90(temp_right, k=-1)
+        faces['L'] = np.rot90(temp_bottom, k=-1)
+        faces['R'] = np.rot90(temp_top, k=-1)
+    elif face == "S":
+        temp_top = np.copy(faces['U'])
+        temp_bottom = np.copy(faces['D'])
+        temp_left = np.copy(faces['L'])
+        temp_right = np.copy(faces['R'])
+
+        faces['U'][1, :] = np.rot90(temp_left, k=-1)[1, :]
+        faces['D'][1, :] = np.rot90(temp_right, k=-1)[1, :]
+        faces['L'][:, 1] = np.rot90(temp_bottom, k=-1)[:, 1]
+        faces['R'][:, 1] = np.rot90(temp_top, k=-1)[:, 1]
+
+
+def _build_move_permutations():
+    """
+    Builds the sticker permutation of every move in `viable_moves`.
+
+    A permutation `p` is applied to a flat state with a single gather, `state[p]`, and two permutations compose the same
+    way: applying `p` and then `q` is the permutation `p[q]`. Prime and double moves are the base clockwise turn applied
+    three and two times.
+
+    Returns:
+        np.ndarray: A (36, 54) matrix with the permutation of each move on the row of its opcode.
+    """
+    permutations = {}
+    for face in set(move[0] for move in viable_moves):
+        labelled = np.arange(solved_state.size).reshape(len(face_names), 3, 3)
+        faces = {name: labelled[i].copy() for i, name in enumerate(face_names)}
+        _quarter_turn(faces, face)
+        quarter = np.concatenate([faces[name].ravel() for name in face_names])
+        permutations[face] = quarter
+        permutations[face + "2"] = quarter[quarter]
+        permutations[face + "'"] = quarter[quarter][quarter]
+    return np.stack([permutations[move] for move in viable_moves]).astype(np.intp)
+
+
+move_permutations = _build_move_permutations()
+
+
+def compose_moves(moves):
+    """
+    Composes a sequence of moves into a single sticker permutation.
+
+    Args:
+        moves (list): Opcodes of viable moves (see `parse_moves` for text).
+
+    Returns:
+        np.ndarray: The permutation with the same effect as applying the moves one by one.
+    """
+    permutation = np.arange(solved_state.size, dtype=np.intp)
+    for move in moves:
+        permutation = permutation[move_permutations[move]]
+    return permutation
+
+
+# The permutation of every opcode, so applying a move or a whole predefined algorithm is a single gather of its row.
+opcode_permutations = np.concatenate((move_permutations,
+                                      [compose_moves(alg_moves[opcode]) for opcode in edge_opcodes + corner_opcodes]))
+
+
+# Pieces checked by the score, listed per face: edges as (adjacent face, sticker on this face, sticker on the adjacent
+# face) and corners as (first adjacent face, second adjacent face, sticker on this face, on the first, on the second).
+adjacencies = {
+    'U': {'edges': [('F', (2, 1), (0, 1)), ('R', (1, 2), (0, 1)), ('B', (0, 1), (0, 1)), ('L', (1, 0), (0, 1))],
+          'corners': [('F', 'R', (2, 2), (0, 2), (0, 0)), ('R', 'B', (0, 2), (0, 2), (0, 0)),
+                      ('B', 'L', (0, 0), (0, 2), (0, 0)), ('L', 'F', (2, 0), (0, 2), (0, 0))]},
+    'D': {'edges': [('F', (0, 1), (2, 1)), ('R', (1, 2), (2, 1)), ('B', (2, 1), (2, 1)), ('L', (1, 0), (2, 1))],
+          'corners': [('F', 'R', (0, 2), (2, 2), (2, 0)), ('R', 'B', (2, 2), (2, 2), (2, 0)),
+                      ('B', 'L', (2, 0), (2, 2), (2, 0)), ('L', 'F', (0, 0), (2, 2), (2, 0))]},
+    'R': {'edges': [('F', (1, 0), (1, 2)), ('B', (1, 2), (1, 0))],
+          'corners': []},
+    'L': {'edges': [('F', (1, 2), (1, 0)), ('B', (1, 0), (1, 2))],
+          'corners': []},
+    'F': {'edges': [],
+          'corners': []},
+    'B': {'edges': [],
+          'corners': []}
+}
+
+
+def _sticker(face, coords):
+    return face_names.index(face) * 9 + coords[0] * 3 + coords[1]
+
+
+def _build_piece_indices():
+    """
+    Flattens `adjacencies` into static sticker index arrays for the vectorized score.
+
+    Edges only have two stickers, so their first sticker is repeated as a third one. This lets all 20 pieces be checked
+    with a single gather: the 12 edges come first, followed by the 8 corners.
+
+    Returns:
+        tuple: The stickers of every piece and the centers they are compared with, both of shape (20, 3).
+    """
+    edges, corners = [], []
+    for face, adjacent in adjacencies.items():
+        for adjacent_face, coords_1, coords_2 in adjacent['edges']:
+            edges.append([(face, coords_1), (adjacent_face, coords_2), (face, coords_1)])
+        for adjacent_face_1, adjacent_face_2, coords_1, coords_2, coords_3 in adjacent['corners']:
+            corners.append([(face, coords_1), (adjacent_face_1, coords_2), (adjacent_face_2, coords_3)])
+    pieces = edges + corners
+    stickers = np.array([[_sticker(face, coords) for face, coords in piece] for piece in pieces], dtype=np.intp)
+    centers = np.array([[_sticker(face, (1, 1)) for face, _ in piece] for piece in pieces], dtype=np.intp)
+    return stickers, centers, len(edges)
+
+
+piece_stickers, piece_centers, edge_count = _build_piece_indices()
+
+
+def misplaced_pieces(states):
+    """
+    Flags every piece that has a sticker which differs from the center of the face it lies on.
+
+    Args:
+        states (np.ndarray): A single state of shape (54,) or a population matrix of shape (N, 54).
+
+    Returns:
+        np.ndarray: Boolean flags of shape (20,) or (N, 20), edges first and corners after `edge_count`.
+    """
+    return (states[..., piece_stickers] != states[..., piece_centers]).any(axis=-1)
+
+
+def score_states(states):
+    """
+    Scores one cube state or a whole matrix of states with a few numpy comparisons.
+
+    Args:
+        states (np.ndarray): A single state of shape (54,) or a population matrix of shape (N, 54).
+
+    Returns:
+        np.ndarray: The total, edge and corner score along the last axis, shape (3,) or (N, 3).
+    """
+    misplaced = misplaced_pieces(states)
+    edge_score = misplaced[..., :edge_count].sum(axis=-1)
+    corner_score = misplaced[..., edge_count:].sum(axis=-1)
+    return np.stack((edge_score + corner_score, edge_score, corner_score), axis=-1)
+
+
+# Odd 64-bit multipliers of `hash_states`, one per 8-byte word of a zero-padded state, from a fixed seed.
+_hash_multipliers = np.random.default_rng(0x5EED).integers(0, 2 ** 63, size=7, dtype=np.uint64) | np.uint64(1)
+_hash_mixer = np.uint64(0x94D049BB133111EB)
+
+
+def hash_states(states):
+    """
+    Hashes one cube state or a whole matrix of states.
+
+    The 54 stickers are read as seven 64-bit words (zero-padded), every word is scrambled with its own multiplier and a
+    xor-shift-multiply step, and the words are summed. Equal states always get equal hashes and different states
+    practically never collide, while a whole population is hashed with a handful of vectorized operations.
+
+    Args:
+        states (np.ndarray): A single state of shape (54,) or a population matrix of shape (N, 54).
+
+    Returns:
+        np.ndarray: The uint64 hash of each state, shape () or (N,).
+    """
+    padded = np.zeros(states.shape[:-1] + (56,), dtype=np.uint8)
+    padded[..., :states.shape[-1]] = states
+    words = padded.view(np.uint64) * _hash_multipliers
+    words ^= words >> np.uint64(29)
+    words *= _hash_mixer
+    words ^= words >> np.uint64(32)
+    return words.sum(axis=-1, dtype=np.uint64)
+
+
+def _build_opcode_slots():
+    """
+    Finds the piece slots touched by every opcode.
+
+    A slot is touched when the opcode moves one of its stickers or one of the centers they are compared with; the
+    misplaced flag of any other slot cannot change.
+
+    Returns:
+        list: One bitmask per opcode, bit `k` set when slot `k` (in the order of `piece_stickers`) is touched.
+    """
+    positions = np.concatenate((piece_stickers, piece_centers), axis=1)
+    touched = (opcode_permutations[:, positions] != positions).any(axis=-1)
+    return [sum(1 << int(slot) for slot in np.flatnonzero(row)) for row in touched]
+
+
+opcode_slots = _build_opcode_slots()
+all_slots = (1 << len(piece_stickers)) - 1
+edge_slots = (1 << edge_count) - 1
+
+# Per-opcode data for the single-cube methods, keyed by opcode and by notation: the permutation as a one-dimensional row
+# (cheaper to gather with than a row of the matrix) and the slots it touches.
+_opcode_rows = list(opcode_permutations)
+_opcode_lookup = {opcode: (_opcode_rows[opcode], opcode_slots[opcode]) for opcode in range(len(opcode_permutations))}
+_opcode_lookup.update({name: _opcode_lookup[opcode] for name, opcode in opcodes.items()})
+_pieces = list(zip(piece_stickers.tolist(), piece_centers.tolist()))
+
+
+def _check_slots(state, slots, misplaced):
+    """
+    Re-checks some piece slots of a single state.
+
+    For one cube, plain Python comparisons on a list are cheaper than numpy calls, and they allow checking only the
+    slots that may have changed.
+
+    Args:
+        state (np.ndarray): A state of shape (54,).
+        slots (int): Bitmask of the slots to check.
+        misplaced (int): Bitmask of misplaced slots, trusted for every slot that is not checked.
+
+    Returns:
+        int: The updated bitmask of misplaced slots.
+    """
+    stickers = state.tolist()
+    while slots:
+        bit = slots & -slots
+        slots ^= bit
+        (sticker_1, sticker_2, sticker_3), (center_1, center_2, center_3) = _pieces[bit.bit_length() - 1]
+        if (stickers[sticker_1] != stickers[center_1] or stickers[sticker_2] != stickers[center_2] or
+                stickers[sticker_3] != stickers[center_3]):
+            misplaced |= bit
+        else:
+            misplaced &= ~bit
+    return misplaced
 
 
 class RubiksCube:
+    __slots__ = ('state', 'move_history', 'scramble', 'solved', '_score', '_misplaced', '_dirty')
+
+    # Tables shared by every cube instead of being rebuilt per instance.
+    adjacencies = adjacencies
+    solved_state = solved_state
+
+    # When True, a score miss only re-checks the piece slots touched since the last score (see `opcode_slots`). This
+    # only concerns single cubes: the solver scores its populations with `score_states`, which checks every slot.
+    incremental_score = True
+
+    # Number of `get_score` calls answered from the cached score and computed from scratch, shared by all cubes.
+    score_cache_hits = 0
+    score_cache_misses = 0
+
+    # Source of the random setups and algorithms of `make_alg`, shared by all cubes, see `seed_sampler`.
+    sampler = MoveSampler()
+
     def __init__(self, scramble=""):
         """
         Initializes a new Rubik's Cube with a default configuration and allows for optional scrambling.
@@ -19,486 +394,129 @@ class RubiksCube:
         - 5: Left (L)
         - 6: Right (R)
 
-        The cube's state is stored in a dictionary with keys as face identifiers and values as the 3x3 numpy arrays.
+        The cube's state is stored as one flat array of 54 uint8 stickers, face after face in the order of `face_names`.
+        The familiar dictionary of 3x3 faces is still available through the `cube` property as views onto that array.
 
         Adjacency information is stored in another dictionary to manage the relationships between faces and their pieces.
-        Used for calculating the score based on the number of scrambled pieces.
+        Used for calculating the score based on the number of scrambled pieces. It is shared at class level together with
+        the solved colours, and the instances use `__slots__`, so a cube only carries its own state and history.
 
         Args:
             scramble (str): A string of moves to scramble the cube after initialization. Each character in the string
                             represents a specific move.
 
         Attributes:
-            cube (dict): Dictionary containing the current state of each face of the cube, represented by 3x3 numpy arrays.
-            adjacencies (dict): Contains the adjacency information for each face, detailing which rows or columns of one
-                                face connect to another face during rotations.
-            move_history (list): A list to keep track of each move applied to the cube.
+            state (np.ndarray): The 54 stickers of the cube, see `face_names` for the layout.
+            cube (dict): Dictionary view of `state` with each face as a 3x3 numpy array.
+            adjacencies (dict): Class attribute with the adjacency information for each face, detailing which rows or
+                                columns of one face connect to another face during rotations.
+            solved_state (np.ndarray): Class attribute with the stickers of a solved cube.
+            move_history (MoveHistory): An immutable record of each move applied to the cube, shared with its copies.
             scramble (str): The initial set of moves applied to the cube upon creation.
             solved (bool): A flag to indicate whether the cube is in a solved state.
+            _score (tuple): The memoized result of `get_score`, or None when the state changed since the last call.
+            _misplaced (int): Bitmask of the misplaced piece slots, valid for every slot not in `_dirty`.
+            _dirty (int): Bitmask of the piece slots touched since `_misplaced` was last brought up to date.
 
         This class also initializes the cube to a solved state unless a scramble sequence is provided, which will
         mix up the cube according to the sequence of moves defined.
         """
-        self.cube = {
-            'F': np.array([[1 for _ in range(3)] for _ in range(3)]),
-            'B': np.array([[2 for _ in range(3)] for _ in range(3)]),
-            'U': np.array([[3 for _ in range(3)] for _ in range(3)]),
-            'D': np.array([[4 for _ in range(3)] for _ in range(3)]),
-            'L': np.array([[5 for _ in range(3)] for _ in range(3)]),
-            'R': np.array([[6 for _ in range(3)] for _ in range(3)])
-        }
-        self.adjacencies = {
-            'U': {'edges': [('F', (2, 1), (0, 1)), ('R', (1, 2), (0, 1)), ('B', (0, 1), (0, 1)), ('L', (1, 0), (0, 1))],
-                  'corners': [('F', 'R', (2, 2), (0, 2), (0, 0)), ('R', 'B', (0, 2), (0, 2), (0, 0)),
-                              ('B', 'L', (0, 0), (0, 2), (0, 0)), ('L', 'F', (2, 0), (0, 2), (0, 0))]},
-            'D': {'edges': [('F', (0, 1), (2, 1)), ('R', (1, 2), (2, 1)), ('B', (2, 1), (2, 1)), ('L', (1, 0), (2, 1))],
-                  'corners': [('F', 'R', (0, 2), (2, 2), (2, 0)), ('R', 'B', (2, 2), (2, 2), (2, 0)),
-                              ('B', 'L', (2, 0), (2, 2), (2, 0)), ('L', 'F', (0, 0), (2, 2), (2, 0))]},
-            'R': {'edges': [('F', (1, 0), (1, 2)), ('B', (1, 2), (1, 0))],
-                  'corners': []},
-            'L': {'edges': [('F', (1, 2), (1, 0)), ('B', (1, 0), (1, 2))],
-                  'corners': []},
-            'F': {'edges': [],
-                  'corners': []},
-            'B': {'edges': [],
-                  'corners': []}
-        }
-        self.move_history = []
+        self.state = self.solved_state.copy()
+        self.move_history = empty_history
         self.scramble = scramble
         self.solved = False
+        self._score = None
+        self._misplaced = 0
+        self._dirty = 0
 
     def get_scramble(self):
         return self.scramble
 
+    @property
+    def cube(self):
+        faces = self.state.reshape(len(face_names), 3, 3)
+        return {name: faces[i] for i, name in enumerate(face_names)}
+
+    @classmethod
+    def score_cache_info(cls):
+        """
+        Returns the hit and miss counters of the memoized `get_score`.
+
+        Returns:
+            dict: The number of cache hits and misses since the start or the last `reset_score_cache_info` call.
+        """
+        return {'hits': cls.score_cache_hits, 'misses': cls.score_cache_misses}
+
+    @classmethod
+    def reset_score_cache_info(cls):
+        cls.score_cache_hits = 0
+        cls.score_cache_misses = 0
+
+    @classmethod
+    def seed_sampler(cls, seed=None):
+        """
+        Replaces the shared sampler of the random algorithms, so the following `make_alg` calls can be repeated exactly.
+
+        Args:
+            seed (int | np.random.SeedSequence, optional): Seed of the new `MoveSampler`, a fresh one when omitted.
+        """
+        cls.sampler = MoveSampler(seed)
+
     def reset_state(self):
-        self.cube = {
-            'F': np.array([[1 for _ in range(3)] for _ in range(3)]),
-            'B': np.array([[2 for _ in range(3)] for _ in range(3)]),
-            'U': np.array([[3 for _ in range(3)] for _ in range(3)]),
-            'D': np.array([[4 for _ in range(3)] for _ in range(3)]),
-            'L': np.array([[5 for _ in range(3)] for _ in range(3)]),
-            'R': np.array([[6 for _ in range(3)] for _ in range(3)])
-        }
+        self.state = self.solved_state.copy()
+        self._score = None
+        self._misplaced = 0
+        self._dirty = 0
+
+    def load_state(self, state):
+        """
+        Replaces the stickers of the cube, for example with a row of a population.
+
+        Args:
+            state (np.ndarray): The new state of shape (54,), used as is (not copied).
+        """
+        self.state = state
+        self._score = None
+        self._dirty = all_slots
 
     def copy(self):
-        new_cube = RubiksCube(self.scramble)
-        new_cube.cube = copy.deepcopy(self.cube)
-        new_cube.move_history = copy.deepcopy(self.move_history)
+        # Bypass __init__, everything it would set up is overwritten right away. The history is immutable and shared.
+        new_cube = RubiksCube.__new__(RubiksCube)
+        new_cube.state = self.state.copy()
+        new_cube.move_history = self.move_history
+        new_cube.scramble = self.scramble
         new_cube.solved = self.solved
+        new_cube._score = self._score
+        new_cube._misplaced = self._misplaced
+        new_cube._dirty = self._dirty
         return new_cube
 
     def update(self, other):
         self.scramble = other.scramble
-        self.cube = copy.deepcopy(other.cube)
-        self.move_history = copy.deepcopy(other.move_history)
+        self.state = other.state.copy()
+        self.move_history = other.move_history
         self.solved = other.solved
+        self._score = other._score
+        self._misplaced = other._misplaced
+        self._dirty = other._dirty
 
     def rotate_face(self, face):
         """
                Rotates a specified face of the cube and updates adjacent edges accordingly.
 
+               The move is applied as one gather with its precomputed permutation from `opcode_permutations`. Unknown
+               notation (such as the empty string produced by splitting an empty scramble) leaves the cube unchanged.
+
                Args:
-                   face (str): The face to rotate, followed by an optional direction (' or 2).
-                               'F', 'B', 'U', 'D', 'L', 'R', 'M', 'E', 'S', 'x', 'y', 'z'.
+                   face (str or int): The face to rotate, followed by an optional direction (' or 2).
+                                      'F', 'B', 'U', 'D', 'L', 'R', 'M', 'E', 'S', 'x', 'y', 'z'. An opcode is
+                                      accepted as well.
                """
-
-        if face == "F":
-            self.cube["F"] = np.rot90(self.cube["F"], k=-1)
-            temp_top = np.copy(self.cube['U'][2, :])
-            temp_bottom = np.copy(self.cube['D'][0, :])
-            temp_left = np.copy(self.cube['L'][:, 2])
-            temp_right = np.copy(self.cube['R'][:, 0])
-
-            self.cube['U'][2, :] = temp_left[::-1]
-            self.cube['D'][0, :] = temp_right[::-1]
-            self.cube['L'][:, 2] = temp_bottom
-            self.cube['R'][:, 0] = temp_top
-        elif face == "F'":
-            self.cube["F"] = np.rot90(self.cube["F"])
-            temp_top = np.copy(self.cube['U'][2, :])
-            temp_bottom = np.copy(self.cube['D'][0, :])
-            temp_left = np.copy(self.cube['L'][:, 2])
-            temp_right = np.copy(self.cube['R'][:, 0])
-
-            self.cube['U'][2, :] = temp_right
-            self.cube['D'][0, :] = temp_left
-            self.cube['L'][:, 2] = temp_top[::-1]
-            self.cube['R'][:, 0] = temp_bottom[::-1]
-        elif face == "F2":
-            self.cube["F"] = np.rot90(self.cube["F"], k=2)
-            temp_top = np.copy(self.cube['U'][2, :])
-            temp_bottom = np.copy(self.cube['D'][0, :])
-            temp_left = np.copy(self.cube['L'][:, 2])
-            temp_right = np.copy(self.cube['R'][:, 0])
-
-            self.cube['U'][2, :] = temp_bottom[::-1]
-            self.cube['D'][0, :] = temp_top[::-1]
-            self.cube['L'][:, 2] = temp_right[::-1]
-            self.cube['R'][:, 0] = temp_left[::-1]
-
-        elif face == "D":
-            self.cube["D"] = np.rot90(self.cube["D"], k=-1)
-            temp_front = np.copy(self.cube['F'][2, :])
-            temp_left = np.copy(self.cube['L'][2, :])
-            temp_back = np.copy(self.cube['B'][2, :])
-            temp_right = np.copy(self.cube['R'][2, :])
-
-            self.cube['B'][2, :] = temp_right
-            self.cube['R'][2, :] = temp_front
-            self.cube['F'][2, :] = temp_left
-            self.cube['L'][2, :] = temp_back
-        elif face == "D'":
-            self.cube["D"] = np.rot90(self.cube["D"])
-            temp_front = np.copy(self.cube['F'][2, :])
-            temp_left = np.copy(self.cube['L'][2, :])
-            temp_back = np.copy(self.cube['B'][2, :])
-            temp_right = np.copy(self.cube['R'][2, :])
-
-            self.cube['B'][2, :] = temp_left
-            self.cube['R'][2, :] = temp_back
-            self.cube['F'][2, :] = temp_right
-            self.cube['L'][2, :] = temp_front
-        elif face == "D2":
-            self.cube["D"] = np.rot90(self.cube["D"], k=2)
-            temp_front = np.copy(self.cube['F'][2, :])
-            temp_left = np.copy(self.cube['L'][2, :])
-            temp_back = np.copy(self.cube['B'][2, :])
-            temp_right = np.copy(self.cube['R'][2, :])
-
-            self.cube['B'][2, :] = temp_front
-            self.cube['R'][2, :] = temp_left
-            self.cube['F'][2, :] = temp_back
-            self.cube['L'][2, :] = temp_right
-        elif face == "R":
-            self.cube["R"] = np.rot90(self.cube["R"], k=-1)
-            temp_front = np.copy(self.cube['F'][:, 2])
-            temp_up = np.copy(self.cube['U'][:, 2])
-            temp_down = np.copy(self.cube['D'][:, 2])
-            temp_back = np.copy(self.cube['B'][:, 0])
-
-            self.cube['F'][:, 2] = temp_down
-            self.cube['U'][:, 2] = temp_front
-            self.cube['D'][:, 2] = temp_back[::-1]
-            self.cube['B'][:, 0] = temp_up[::-1]
-        elif face == "R'":
-            self.cube["R"] = np.rot90(self.cube["R"])
-            temp_front = np.copy(self.cube['F'][:, 2])
-            temp_up = np.copy(self.cube['U'][:, 2])
-            temp_down = np.copy(self.cube['D'][:, 2])
-            temp_back = np.copy(self.cube['B'][:, 0])
-
-            self.cube['F'][:, 2] = temp_up
-            self.cube['U'][:, 2] = temp_back[::-1]
-            self.cube['D'][:, 2] = temp_front
-            self.cube['B'][:, 0] = temp_down[::-1]
-        elif face == "R2":
-            self.cube["R"] = np.rot90(self.cube["R"], k=2)
-            temp_front = np.copy(self.cube['F'][:, 2])
-            temp_up = np.copy(self.cube['U'][:, 2])
-            temp_down = np.copy(self.cube['D'][:, 2])
-            temp_back = np.copy(self.cube['B'][:, 0])
-
-            self.cube['F'][:, 2] = temp_back[::-1]
-            self.cube['U'][:, 2] = temp_down
-            self.cube['D'][:, 2] = temp_up
-            self.cube['B'][:, 0] = temp_front[::-1]
-        elif face == "L":
-            self.cube["L"] = np.rot90(self.cube["L"], k=-1)
-            temp_front = np.copy(self.cube['F'][:, 0])
-            temp_up = np.copy(self.cube['U'][:, 0])
-            temp_down = np.copy(self.cube['D'][:, 0])
-            temp_back = np.copy(self.cube['B'][:, 2])
-
-            self.cube['F'][:, 0] = temp_up
-            self.cube['U'][:, 0] = temp_back[::-1]
-            self.cube['D'][:, 0] = temp_front
-            self.cube['B'][:, 2] = temp_down[::-1]
-        elif face == "L'":
-            self.cube["L"] = np.rot90(self.cube["L"])
-            temp_front = np.copy(self.cube['F'][:, 0])
-            temp_up = np.copy(self.cube['U'][:, 0])
-            temp_down = np.copy(self.cube['D'][:, 0])
-            temp_back = np.copy(self.cube['B'][:, 2])
-
-            self.cube['F'][:, 0] = temp_down
-            self.cube['U'][:, 0] = temp_front
-            self.cube['D'][:, 0] = temp_back[::-1]
-            self.cube['B'][:, 2] = temp_up[::-1]
-        elif face == "L2":
-            self.cube["L"] = np.rot90(self.cube["L"], k=2)
-            temp_front = np.copy(self.cube['F'][:, 0])
-            temp_up = np.copy(self.cube['U'][:, 0])
-            temp_down = np.copy(self.cube['D'][:, 0])
-            temp_back = np.copy(self.cube['B'][:, 2])
-
-            self.cube['F'][:, 0] = temp_back[::-1]
-            self.cube['U'][:, 0] = temp_down
-            self.cube['D'][:, 0] = temp_up
-            self.cube['B'][:, 2] = temp_front[::-1]
-        elif face == "B":
-            self.cube["B"] = np.rot90(self.cube["B"], k=-1)
-            temp_top = np.copy(self.cube['U'][0, :])
-            temp_bottom = np.copy(self.cube['D'][2, :])
-            temp_left = np.copy(self.cube['L'][:, 0])
-            temp_right = np.copy(self.cube['R'][:, 2])
-
-            self.cube['U'][0, :] = temp_right
-            self.cube['D'][2, :] = temp_left
-            self.cube['L'][:, 0] = temp_top[::-1]
-            self.cube['R'][:, 2] = temp_bottom[::-1]
-        elif face == "B'":
-            self.cube["B"] = np.rot90(self.cube["B"])
-            temp_top = np.copy(self.cube['U'][0, :])
-            temp_bottom = np.copy(self.cube['D'][2, :])
-            temp_left = np.copy(self.cube['L'][:, 0])
-            temp_right = np.copy(self.cube['R'][:, 2])
-
-            self.cube['U'][0, :] = temp_left[::-1]
-            self.cube['D'][2, :] = temp_right[::-1]
-            self.cube['L'][:, 0] = temp_bottom
-            self.cube['R'][:, 2] = temp_top
-        elif face == "B2":
-            self.cube["B"] = np.rot90(self.cube["B"], k=2)
-            temp_top = np.copy(self.cube['U'][0, :])
-            temp_bottom = np.copy(self.cube['D'][2, :])
-            temp_left = np.copy(self.cube['L'][:, 0])
-            temp_right = np.copy(self.cube['R'][:, 2])
-
-            self.cube['U'][0, :] = temp_bottom[::-1]
-            self.cube['D'][2, :] = temp_top[::-1]
-            self.cube['L'][:, 0] = temp_right[::-1]
-            self.cube['R'][:, 2] = temp_left[::-1]
-        elif face == "U":
-            self.cube["U"] = np.rot90(self.cube["U"], k=-1)
-            temp_front = np.copy(self.cube['F'][0, :])
-            temp_left = np.copy(self.cube['L'][0, :])
-            temp_back = np.copy(self.cube['B'][0, :])
-            temp_right = np.copy(self.cube['R'][0, :])
-
-            self.cube['F'][0, :] = temp_right
-            self.cube['L'][0, :] = temp_front
-            self.cube['B'][0, :] = temp_left
-            self.cube['R'][0, :] = temp_back
-        elif face == "U'":
-            self.cube["U"] = np.rot90(self.cube["U"])
-            temp_front = np.copy(self.cube['F'][0, :])
-            temp_left = np.copy(self.cube['L'][0, :])
-            temp_back = np.copy(self.cube['B'][0, :])
-            temp_right = np.copy(self.cube['R'][0, :])
-
-            self.cube['F'][0, :] = temp_left
-            self.cube['L'][0, :] = temp_back
-            self.cube['B'][0, :] = temp_right
-            self.cube['R'][0, :] = temp_front
-        elif face == "U2":
-            self.cube["U"] = np.rot90(self.cube["U"], k=2)
-            temp_front = np.copy(self.cube['F'][0, :])
-            temp_left = np.copy(self.cube['L'][0, :])
-            temp_back = np.copy(self.cube['B'][0, :])
-            temp_right = np.copy(self.cube['R'][0, :])
-
-            self.cube['F'][0, :] = temp_back
-            self.cube['L'][0, :] = temp_right
-            self.cube['B'][0, :] = temp_front
-            self.cube['R'][0, :] = temp_left
-        elif face == "x":
-            self.cube["R"] = np.rot90(self.cube["R"], k=-1)
-            self.cube["L"] = np.rot90(self.cube["L"])
-            temp_front = np.copy(self.cube['F'])
-            temp_up = np.copy(self.cube['U'])
-            temp_down = np.copy(self.cube['D'])
-            temp_back = np.copy(self.cube['B'])
-
-            self.cube['F'] = temp_down
-            self.cube['U'] = temp_front
-            self.cube['D'] = np.rot90(temp_back, k=2)
-            self.cube['B'] = np.rot90(temp_up, k=2)
-        elif face == "x'":
-            self.cube["R"] = np.rot90(self.cube["R"])
-            self.cube["L"] = np.rot90(self.cube["L"], k=-1)
-            temp_front = np.copy(self.cube['F'])
-            temp_up = np.copy(self.cube['U'])
-            temp_down = np.copy(self.cube['D'])
-            temp_back = np.copy(self.cube['B'])
-
-            self.cube['F'] = temp_up
-            self.cube['U'] = np.rot90(temp_back, k=2)
-            self.cube['D'] = temp_front
-            self.cube['B'] = np.rot90(temp_down, k=2)
-        elif face == "x2":
-            self.cube["R"] = np.rot90(self.cube["R"], k=2)
-            self.cube["L"] = np.rot90(self.cube["L"], k=2)
-            temp_front = np.copy(self.cube['F'])
-            temp_up = np.copy(self.cube['U'])
-            temp_down = np.copy(self.cube['D'])
-            temp_back = np.copy(self.cube['B'])
-
-            self.cube['F'] = np.rot90(temp_back, k=2)
-            self.cube['U'] = temp_down
-            self.cube['D'] = temp_up
-            self.cube['B'] = np.rot90(temp_front, k=2)
-        elif face == "M":
-            temp_front = np.copy(self.cube['F'])
-            temp_up = np.copy(self.cube['U'])
-            temp_down = np.copy(self.cube['D'])
-            temp_back = np.copy(self.cube['B'])
-
-            self.cube['F'][:, 1] = temp_up[:, 1]
-            self.cube['U'][:, 1] = np.rot90(temp_back, k=2)[:, 1]
-            self.cube['D'][:, 1] = temp_front[:, 1]
-            self.cube['B'][:, 1] = np.rot90(temp_down, k=2)[:, 1]
-        elif face == "M'":
-            temp_front = np.copy(self.cube['F'])
-            temp_up = np.copy(self.cube['U'])
-            temp_down = np.copy(self.cube['D'])
-            temp_back = np.copy(self.cube['B'])
-
-            self.cube['F'][:, 1] = temp_down[:, 1]
-            self.cube['U'][:, 1] = temp_front[:, 1]
-            self.cube['D'][:, 1] = np.rot90(temp_back, k=2)[:, 1]
-            self.cube['B'][:, 1] = np.rot90(temp_up, k=2)[:, 1]
-        elif face == "M2":
-            temp_front = np.copy(self.cube['F'])
-            temp_up = np.copy(self.cube['U'])
-            temp_down = np.copy(self.cube['D'])
-            temp_back = np.copy(self.cube['B'])
-
-            self.cube['F'][:, 1] = np.rot90(temp_back, k=2)[:, 1]
-            self.cube['U'][:, 1] = temp_down[:, 1]
-            self.cube['D'][:, 1] = temp_up[:, 1]
-            self.cube['B'][:, 1] = np.rot90(temp_front, k=2)[:, 1]
-        elif face == "y":
-            self.cube["U"] = np.rot90(self.cube["U"], k=-1)
-            self.cube["D"] = np.rot90(self.cube["D"])
-            temp_front = np.copy(self.cube['F'])
-            temp_left = np.copy(self.cube['L'])
-            temp_back = np.copy(self.cube['B'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['F'] = temp_right
-            self.cube['L'] = temp_front
-            self.cube['B'] = temp_left
-            self.cube['R'] = temp_back
-        elif face == "y'":
-            self.cube["U"] = np.rot90(self.cube["U"])
-            self.cube["D"] = np.rot90(self.cube["D"], k=-1)
-            temp_front = np.copy(self.cube['F'])
-            temp_left = np.copy(self.cube['L'])
-            temp_back = np.copy(self.cube['B'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['F'] = temp_left
-            self.cube['L'] = temp_back
-            self.cube['B'] = temp_right
-            self.cube['R'] = temp_front
-        elif face == "y2":
-            self.cube["U"] = np.rot90(self.cube["U"], k=2)
-            self.cube["D"] = np.rot90(self.cube["D"], k=2)
-            temp_front = np.copy(self.cube['F'])
-            temp_left = np.copy(self.cube['L'])
-            temp_back = np.copy(self.cube['B'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['F'] = temp_back
-            self.cube['L'] = temp_right
-            self.cube['B'] = temp_front
-            self.cube['R'] = temp_left
-        elif face == "E":
-            temp_front = np.copy(self.cube['F'])
-            temp_left = np.copy(self.cube['L'])
-            temp_back = np.copy(self.cube['B'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['F'][1, :] = temp_left[1, :]
-            self.cube['L'][1, :] = temp_back[1, :]
-            self.cube['B'][1, :] = temp_right[1, :]
-            self.cube['R'][1, :] = temp_front[1, :]
-        elif face == "E'":
-            temp_front = np.copy(self.cube['F'])
-            temp_left = np.copy(self.cube['L'])
-            temp_back = np.copy(self.cube['B'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['F'][1, :] = temp_right[1, :]
-            self.cube['L'][1, :] = temp_front[1, :]
-            self.cube['B'][1, :] = temp_left[1, :]
-            self.cube['R'][1, :] = temp_back[1, :]
-        elif face == "E2":
-            temp_front = np.copy(self.cube['F'])
-            temp_left = np.copy(self.cube['L'])
-            temp_back = np.copy(self.cube['B'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['F'][1, :] = temp_back[1, :]
-            self.cube['L'][1, :] = temp_right[1, :]
-            self.cube['B'][1, :] = temp_front[1, :]
-            self.cube['R'][1, :] = temp_left[1, :]
-        elif face == "z":
-            self.cube["F"] = np.rot90(self.cube["F"], k=-1)
-            self.cube["B"] = np.rot90(self.cube["B"])
-            temp_top = np.copy(self.cube['U'])
-            temp_bottom = np.copy(self.cube['D'])
-            temp_left = np.copy(self.cube['L'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['U'] = np.rot90(temp_left, k=-1)
-            self.cube['D'] = np.rot90(temp_right, k=-1)
-            self.cube['L'] = np.rot90(temp_bottom, k=-1)
-            self.cube['R'] = np.rot90(temp_top, k=-1)
-        elif face == "z'":
-            self.cube["F"] = np.rot90(self.cube["F"])
-            self.cube["B"] = np.rot90(self.cube["B"], k=-1)
-            temp_top = np.copy(self.cube['U'])
-            temp_bottom = np.copy(self.cube['D'])
-            temp_left = np.copy(self.cube['L'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['U'] = np.rot90(temp_right)
-            self.cube['D'] = np.rot90(temp_left)
-            self.cube['L'] = np.rot90(temp_top)
-            self.cube['R'] = np.rot90(temp_bottom)
-        elif face == "z2":
-            self.cube["F"] = np.rot90(self.cube["F"], k=2)
-            self.cube["B"] = np.rot90(self.cube["B"], k=2)
-            temp_top = np.copy(self.cube['U'])
-            temp_bottom = np.copy(self.cube['D'])
-            temp_left = np.copy(self.cube['L'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['U'] = np.rot90(temp_bottom, k=2)
-            self.cube['D'] = np.rot90(temp_top, k=2)
-            self.cube['L'] = np.rot90(temp_right, k=2)
-            self.cube['R'] = np.rot90(temp_left, k=2)
-        elif face == "S":
-            temp_top = np.copy(self.cube['U'])
-            temp_bottom = np.copy(self.cube['D'])
-            temp_left = np.copy(self.cube['L'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['U'][1, :] = np.rot90(temp_left, k=-1)[1, :]
-            self.cube['D'][1, :] = np.rot90(temp_right, k=-1)[1, :]
-            self.cube['L'][:, 1] = np.rot90(temp_bottom, k=-1)[:, 1]
-            self.cube['R'][:, 1] = np.rot90(temp_top, k=-1)[:, 1]
-        elif face == "S'":
-            temp_top = np.copy(self.cube['U'])
-            temp_bottom = np.copy(self.cube['D'])
-            temp_left = np.copy(self.cube['L'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['U'][1, :] = np.rot90(temp_right)[1, :]
-            self.cube['D'][1, :] = np.rot90(temp_left)[1, :]
-            self.cube['L'][:, 1] = np.rot90(temp_top)[:, 1]
-            self.cube['R'][:, 1] = np.rot90(temp_bottom)[:, 1]
-        elif face == "S2":
-            temp_top = np.copy(self.cube['U'])
-            temp_bottom = np.copy(self.cube['D'])
-            temp_left = np.copy(self.cube['L'])
-            temp_right = np.copy(self.cube['R'])
-
-            self.cube['U'][1, :] = np.rot90(temp_bottom, k=2)[1, :]
-            self.cube['D'][1, :] = np.rot90(temp_top, k=2)[1, :]
-            self.cube['L'][:, 1] = np.rot90(temp_right, k=2)[:, 1]
-            self.cube['R'][:, 1] = np.rot90(temp_left, k=2)[:, 1]
+        entry = _opcode_lookup.get(face)
+        if entry is not None:
+            self.state = self.state[entry[0]]
+            self._score = None
+            self._dirty |= entry[1]
 
     def make_alg(self, alg_name, move_count=1):
         """
@@ -515,122 +533,65 @@ class RubiksCube:
                             - "scramble": Applies a predefined scramble sequence.
             move_count (int): The number of times the algorithm is to be applied (default is 1).
 
-        This method modifies the cube state directly by rotating faces as per the algorithms' definition and updates the
-        move history to track changes.
+        This method modifies the cube state directly by applying the opcodes of the algorithms and extends the move
+        history with one chunk holding every opcode of the call.
 
         For "random_moves_algs_moves_prim_edges" and "random_moves_algs_moves_prim_corners", the method involves a
         three-step process:
-        1. Applying a series of random moves.
+        1. Applying a series of random moves, a canonical setup without redundant moves (see `sample_setups`).
         2. Applying a specific permutation from the predefined list.
         3. Reversing the initial random moves to bring the cube back to a potentially solvable state while embedding the permutation.
 
-        For "scramble", it uses the scramble string split into moves and applies each move to the cube sequentially.
+        For "scramble", it parses the scramble string into opcodes and applies each move to the cube sequentially.
 
-        The method leverages dictionaries of edge and corner permutations which map indices to specific move sequences
-        ensuring varied and random application of these permutations based on random selections.
+        Each predefined algorithm is a single opcode whose precompiled sticker permutation is applied in one step, while
+        the move history still reads as "<index>_Edges" or "<index>_Corners" once translated. The setups and the
+        algorithms are drawn from the shared `sampler`, see `seed_sampler`.
         """
-        permutation_edges = {k: v for (k, v) in enumerate(edge_perms)}
-        permutation_corners = {k: v for (k, v) in enumerate(corner_perms)}
-
-        if alg_name == "random_algs_edges":
-            for j in range(int(move_count)):
-                random_key = random.choice(list(permutation_edges.keys()))
-                random_value = permutation_edges[random_key]
-                moves = random_value.split(" ")
-                for i in range(len(moves)):
-                    self.rotate_face(moves[i])
-
-                self.move_history.append(str(random_key) + "_Edges")
-
-        if alg_name == "random_algs_corners":
-            for j in range(int(move_count)):
-                random_key = random.choice(list(permutation_corners.keys()))
-                random_value = permutation_corners[random_key]
-                moves = random_value.split(" ")
-                for i in range(len(moves)):
-                    self.rotate_face(moves[i])
-
-                self.move_history.append(str(random_key) + "_Corners")
-
-        if alg_name == "random_moves_algs_moves_prim_edges":
-            for j in range(int(move_count)):
-                random_moves_str = " ".join([random.choice(list(viable_moves)) for _ in range(random.randint(0, 7))])
-                random_moves = random_moves_str.split(" ")
-                if random_moves[0] != "":
-                    reverse_random_moves = (reverse_moves(random_moves_str)).split(" ")
-                    for i in range(len(random_moves)):
-                        self.rotate_face(random_moves[i])
-                        self.move_history.append(random_moves[i])
-
-                    random_key = random.choice(list(permutation_edges.keys()))
-                    random_value = permutation_edges[random_key]
-                    moves = random_value.split(" ")
-
-                    for i in range(len(moves)):
-                        self.rotate_face(moves[i])
-                    self.move_history.append(str(random_key) + "_Edges")
-
-                    for i in range(len(reverse_random_moves)):
-                        self.rotate_face(reverse_random_moves[i])
-                        self.move_history.append(reverse_random_moves[i])
-                else:
-                    random_key = random.choice(list(permutation_edges.keys()))
-                    random_value = permutation_edges[random_key]
-                    moves = random_value.split(" ")
-
-                    for i in range(len(moves)):
-                        self.rotate_face(moves[i])
-                    self.move_history.append(str(random_key) + "_Edges")
-
-        if alg_name == "random_moves_algs_moves_prim_corners":
-            for j in range(int(move_count)):
-                random_moves_str = " ".join([random.choice(list(viable_moves)) for _ in range(random.randint(0, 7))])
-                random_moves = random_moves_str.split(" ")
-                if random_moves[0] != "":
-                    reverse_random_moves = (reverse_moves(random_moves_str)).split(" ")
-                    for i in range(len(random_moves)):
-                        self.rotate_face(random_moves[i])
-                        self.move_history.append(random_moves[i])
-
-                    random_key = random.choice(list(permutation_corners.keys()))
-                    random_value = permutation_corners[random_key]
-                    moves = random_value.split(" ")
-
-                    for i in range(len(moves)):
-                        self.rotate_face(moves[i])
-                    self.move_history.append(str(random_key) + "_Corners")
-
-                    for i in range(len(reverse_random_moves)):
-                        self.rotate_face(reverse_random_moves[i])
-                        self.move_history.append(reverse_random_moves[i])
-                else:
-                    random_key = random.choice(list(permutation_corners.keys()))
-                    random_value = permutation_corners[random_key]
-                    moves = random_value.split(" ")
-
-                    for i in range(len(moves)):
-                        self.rotate_face(moves[i])
-                    self.move_history.append(str(random_key) + "_Corners")
+        self._score = None
+        history = []
+        state = self.state
+        dirty = self._dirty
+
+        if alg_name in ("random_algs_edges", "random_algs_corners",
+                        "random_moves_algs_moves_prim_edges", "random_moves_algs_moves_prim_corners"):
+            algs = edge_opcodes if alg_name.endswith("edges") else corner_opcodes
+            with_setup = alg_name.startswith("random_moves_algs_moves_prim")
+            sampler = self.sampler
+            for _ in range(int(move_count)):
+                setup = sampler.setup() if with_setup else ()
+                sequence = list(setup) + [sampler.choice(algs)] + [inverse_opcodes[move] for move in reversed(setup)]
+                for opcode in sequence:
+                    state = state[_opcode_rows[opcode]]
+                    dirty |= opcode_slots[opcode]
+                history.extend(sequence)
 
         if alg_name == "scramble":
-            moves = self.scramble.split(" ")
-            for i in range(len(moves)):
-                self.rotate_face(moves[i])
+            for opcode in parse_moves(self.scramble):
+                state = state[_opcode_rows[opcode]]
+                dirty |= opcode_slots[opcode]
+
+        self.state = state
+        self._dirty = dirty
+        self.move_history = self.move_history.push(history)
 
     def make_alg_from_moves(self, alg=""):
         if alg != "":
-            moves = alg.split(" ")
-            for i in range(len(moves)):
-                self.rotate_face(moves[i])
-                self.move_history.append(moves[i])
+            self._score = None
+            moves = parse_moves(alg)
+            for opcode in moves:
+                self.state = self.state[_opcode_rows[opcode]]
+                self._dirty |= opcode_slots[opcode]
+            self.move_history = self.move_history.push(moves)
             return
 
     def get_score(self):
         """
         Calculates and returns a score based on the current state of the Rubik's Cube, assessing edge and corner alignment.
 
-        This method iterates through each face of the cube, checking the alignment of each edge and corner with the center
-        piece of each face. The scoring is based on the deviation from a solved state:
+        This method checks the alignment of each edge and corner with the center piece of each face, using the sticker
+        indices precomputed from `adjacencies` (see `misplaced_pieces` for the batch form). The scoring is based on the
+        deviation from a solved state:
         - For each edge or corner that is not correctly aligned with the center pieces of its respective faces, the score increments.
         - Edge misalignments increment the edge score.
         - Corner misalignments increment the corner score.
@@ -643,38 +604,39 @@ class RubiksCube:
         Attributes are updated based on the score:
         - `solved` is set to True if the score is 0 (cube is solved), otherwise it is set to False.
 
+        The result is memoized until the next `rotate_face`, `make_alg`, `make_alg_from_moves`, `reset_state` or
+        `update` call, and is carried over by `copy`. Code that replaces the state of an existing cube should use
+        `load_state`. Hits and misses are counted, see `score_cache_info`.
+
+        With `incremental_score` enabled, the cube also remembers which piece slots are misplaced and which slots the
+        moves applied since then have touched, so a miss only re-checks those slots instead of all 20 pieces. Only
+        callers that move and score single cubes, such as the visualizer and the benchmark, benefit: the local search
+        and the scouts move and score whole populations at once (see `Population.get_scores`), and the cubes the
+        solver materialises with `Population.to_cube` start with every slot to check.
+
         Returns:
             tuple: A tuple containing three integers:
                    1. Total score: The sum of edge and corner misalignments.
                    2. Edge score: The total number of edge misalignments.
                    3. Corner score: The total number of corner misalignments.
         """
-        score = 0
-        edge_score = 0
-        corner_score = 0
-        for face in self.cube:
-            center = self.cube[face][1, 1]
-            adjacent = self.adjacencies[face]
-            adjacent_edges = adjacent["edges"]
-            adjacent_corners = adjacent["corners"]
-            for adjacent_face, edge_coords_1, edge_coords_2 in adjacent_edges:
-                if (self.cube[face][edge_coords_1[0]][edge_coords_1[1]] != center or
-                        self.cube[adjacent_face][edge_coords_2[0]][edge_coords_2[1]] != self.cube[adjacent_face][1][1]):
-                    score += 1
-                    edge_score += 1
-            for adjacent_face_1, adjacent_face_2, edge_coords_1, edge_coords_2, edge_coords_3 in adjacent_corners:
-                if (self.cube[face][edge_coords_1[0]][edge_coords_1[1]] != center or
-                        self.cube[adjacent_face_1][edge_coords_2[0]][edge_coords_2[1]] !=
-                        self.cube[adjacent_face_1][1][1] or
-                        self.cube[adjacent_face_2][edge_coords_3[0]][edge_coords_3[1]] !=
-                        self.cube[adjacent_face_2][1][1]):
-                    score += 1
-                    corner_score += 1
-        if score == 0:
-            self.solved = True
+        if self._score is not None:
+            RubiksCube.score_cache_hits += 1
+            self.solved = self._score[0] == 0
+            return self._score
+
+        RubiksCube.score_cache_misses += 1
+        if self.incremental_score:
+            self._misplaced = _check_slots(self.state, self._dirty, self._misplaced)
         else:
-            self.solved = False
-        return score, edge_score, corner_score
+            self._misplaced = _check_slots(self.state, all_slots, 0)
+        self._dirty = 0
+        edge_score = (self._misplaced & edge_slots).bit_count()
+        corner_score = (self._misplaced >> edge_count).bit_count()
+        score = edge_score + corner_score
+        self.solved = score == 0
+        self._score = (score, edge_score, corner_score)
+        return self._score
 
     def display(self):
         """
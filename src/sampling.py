@@ -0,0 +1,162 @@
+import secrets
+
+import numpy as np
+
+from .permutation_table import setup_opcodes, setup_successors
+
+# Longest random setup used by the "random_moves_algs_moves_prim_*" conjugates.
+max_setup_length = 7
+
+
+def _build_alias_table(weights):
+    """
+    Builds the alias table of a discrete distribution (Vose's method), so it can be sampled with one uniform number.
+
+    Args:
+        weights (np.ndarray): Non-negative weights of the outcomes, not all zero.
+
+    Returns:
+        tuple: For every outcome, the probability of keeping it and the outcome to take instead.
+    """
+    probabilities = weights * len(weights) / weights.sum()
+    keep = np.ones(len(weights))
+    alias = np.arange(len(weights))
+    small = [index for index, probability in enumerate(probabilities) if probability < 1]
+    large = [index for index, probability in enumerate(probabilities) if probability >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        keep[less] = probabilities[less]
+        alias[less] = more
+        probabilities[more] -= 1 - probabilities[less]
+        (small if probabilities[more] < 1 else large).append(more)
+    return keep, alias
+
+
+def _build_setup_tables():
+    """
+    Builds the tables `sample_setups` draws canonical setup sequences from.
+
+    `counts[k, s]` is the number of canonical sequences of `k` more moves that may follow a setup in state `s` of the
+    `setup_successors` automaton. Choosing every move with a probability proportional to the number of sequences it
+    leads to makes all canonical sequences of a given length equally likely.
+
+    Returns:
+        tuple: The setup opcodes as an array, the next state for every state and move, and the alias tables (see
+               `_build_alias_table`) of the next move, for every number of remaining moves and every state, the first
+               state standing for the start. The alias tables are flattened, so one index picks the entry of a row.
+    """
+    moves = np.array(setup_opcodes)
+    position = {move: index for index, move in enumerate(setup_opcodes)}
+    allowed = np.zeros((len(setup_successors), len(moves)))
+    following = np.zeros((len(setup_successors), len(moves)), dtype=np.intp)
+    for state, transitions in enumerate(setup_successors):
+        for move, next_state in transitions.items():
+            allowed[state, position[move]] = 1
+            following[state, position[move]] = next_state
+
+    counts = np.ones((max_setup_length, len(setup_successors)))
+    for length in range(1, max_setup_length):
+        counts[length] = (allowed * counts[length - 1][following]).sum(axis=1)
+    keep = np.zeros((max_setup_length, len(setup_successors), len(moves)))
+    alias = np.zeros((max_setup_length, len(setup_successors), len(moves)), dtype=np.intp)
+    for remaining in range(max_setup_length):
+        for state in range(len(setup_successors)):
+            keep[remaining, state], alias[remaining, state] = _build_alias_table(
+                allowed[state] * counts[remaining][following[state]])
+    return moves, following, keep.ravel(), alias.ravel()
+
+
+_setup_moves, _setup_following, _setup_keep, _setup_alias = _build_setup_tables()
+
+
+def sample_setups(rng, count):
+    """
+    Draws random canonical setup sequences for many conjugates at once.
+
+    The length is uniform between 0 and `max_setup_length`, and the sequence is uniform among the canonical sequences of
+    that length, so no two draws are different spellings of the same layer turns (see `setup_successors`). Every move
+    costs one uniform number and three table lookups per row.
+
+    Args:
+        rng (np.random.Generator): The generator to draw from.
+        count (int): Number of sequences.
+
+    Returns:
+        tuple: A (count, max_setup_length) matrix of setup opcodes, valid up to each row's length, and the lengths.
+    """
+    lengths = rng.integers(0, max_setup_length + 1, size=count)
+    uniforms = rng.random((count, max_setup_length)) * len(_setup_moves)
+    # Rows sorted by decreasing length, so the rows that still need a move at any step are a prefix.
+    order = np.argsort(-lengths, kind='stable')
+    sorted_lengths = lengths[order]
+    active_counts = np.searchsorted(-sorted_lengths, -np.arange(max_setup_length), side='left')
+    sorted_setups = np.zeros((count, max_setup_length), dtype=np.intp)
+    states = np.zeros(count, dtype=np.intp)
+    for step in range(max_setup_length):
+        active = int(active_counts[step])
+        if not active:
+            break
+        # The integer part of the uniform picks an outcome, the fractional part decides between it and its alias.
+        outcomes = uniforms[:active, step].astype(np.intp)
+        tables = ((sorted_lengths[:active] - step - 1) * len(_setup_following) + states[:active]) * len(_setup_moves)
+        entries = tables + outcomes
+        choices = np.where(uniforms[:active, step] - outcomes < _setup_keep[entries], outcomes, _setup_alias[entries])
+        sorted_setups[:active, step] = choices
+        states[:active] = _setup_following[states[:active], choices]
+    setups = np.empty_like(sorted_setups)
+    setups[order] = _setup_moves[sorted_setups]
+    return setups, lengths
+
+
+def fresh_seed():
+    """
+    Returns a new random seed that fits a signed 64-bit integer, so it can be logged in any backend and replayed.
+    """
+    return secrets.randbits(63)
+
+
+class MoveSampler:
+    def __init__(self, seed=None, block_size=4096):
+        """
+        Initializes a source of random setups and algorithm choices for `RubiksCube.make_alg`.
+
+        Values are drawn from a seeded `np.random.Generator` in blocks of `block_size` and handed out one by one, so a
+        single cube pays one list lookup per value instead of one generator call. The same seed always gives the same
+        sequence of values.
+
+        Args:
+            seed (int | np.random.SeedSequence, optional): Seed of the generator, `fresh_seed` when omitted.
+            block_size (int): Number of values drawn at once.
+
+        Attributes:
+            seed (int | np.random.SeedSequence): The seed the generator was created from.
+            rng (np.random.Generator): The generator behind the blocks.
+            block_size (int): Number of values drawn at once.
+        """
+        self.seed = seed if seed is not None else fresh_seed()
+        self.rng = np.random.default_rng(self.seed)
+        self.block_size = block_size
+        self._setups = []
+        self._integers = {}
+
+    def setup(self):
+        """
+        Returns a random canonical setup of 0 to `max_setup_length` moves as a tuple of opcodes, see `sample_setups`.
+        """
+        if not self._setups:
+            setups, lengths = sample_setups(self.rng, self.block_size)
+            self._setups = [tuple(row[:length]) for row, length in zip(setups.tolist(), lengths.tolist())]
+            self._setups.reverse()
+        return self._setups.pop()
+
+    def integer(self, high):
+        """
+        Returns a random integer in [0, high).
+        """
+        block = self._integers.get(high)
+        if not block:
+            block = self._integers[high] = self.rng.integers(0, high, size=self.block_size).tolist()
+        return block.pop()
+
+    def choice(self, options):
+        return options[self.integer(len(options))]
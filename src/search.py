@@ -0,0 +1,189 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .population import Population
+from .rubikscube import hash_states
+
+
+class TabuSet:
+    def __init__(self, size):
+        """
+        Initializes a bounded set of recently visited cube states, kept as `hash_states` hashes in LRU order.
+
+        Adding a state that is already present refreshes it; once the set holds more than `size` states, the least
+        recently added ones are dropped.
+
+        Args:
+            size (int): Maximum number of states.
+
+        Attributes:
+            size (int): Maximum number of states.
+            entries (OrderedDict): The hashes, least recently added first.
+        """
+        self.size = size
+        self.entries = OrderedDict()
+        self._array = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, hashes):
+        """
+        Adds or refreshes states.
+
+        Args:
+            hashes (np.ndarray): Hashes of the states, see `hash_states`.
+        """
+        for key in hashes.tolist():
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            else:
+                self.entries[key] = None
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        self._array = None
+
+    def to_array(self):
+        """
+        Returns the hashes as a uint64 array, which is what the search kernels and worker processes receive.
+        """
+        if self._array is None:
+            self._array = np.fromiter(self.entries, dtype=np.uint64, count=len(self.entries))
+        return self._array
+
+
+def selection_keys(scores, duplicates=None):
+    """
+    Builds one integer sort key per row that orders rows the way the Bees Algorithm ranks cubes.
+
+    Rows are ranked by corner score, then, among cubes with solved corners, by edge score. Ties keep the row order, as
+    a stable sort would, and with `duplicates` the marked rows come after every other row. Because every key is
+    unique, a partial selection on the keys picks exactly the rows a full stable sort would put first.
+
+    Args:
+        scores (np.ndarray): A (N, 3) score matrix, see `Population.get_scores`.
+        duplicates (np.ndarray, optional): A boolean mask of rows to rank last.
+
+    Returns:
+        np.ndarray: The int64 keys, lower is better.
+    """
+    edge_key = np.where(scores[:, 2] == 0, scores[:, 1], 0)
+    keys = scores[:, 2].astype(np.int64) * 64 + edge_key
+    if duplicates is not None:
+        keys += duplicates * 64 * 64
+    return keys * len(scores) + np.arange(len(scores))
+
+
+def select_rows(keys, num_survivors, num_best):
+    """
+    Selects the best rows with `np.argpartition` instead of sorting all of them.
+
+    Args:
+        keys (np.ndarray): Unique sort keys, see `selection_keys`.
+        num_survivors (int): Number of rows to keep.
+        num_best (int): Number of leading rows that have to be in order, at most `num_survivors`.
+
+    Returns:
+        np.ndarray: The indices of the `num_survivors` best rows. The first `num_best` are sorted from the best, the
+                    rest follow in no particular order.
+    """
+    survivors = np.arange(len(keys))
+    if num_survivors < len(keys):
+        survivors = np.argpartition(keys, num_survivors - 1)[:num_survivors] if num_survivors else survivors[:0]
+    if num_best < len(survivors):
+        partition = np.argpartition(keys[survivors], num_best - 1) if num_best else np.arange(len(survivors))
+        survivors = survivors[partition]
+    best = survivors[:num_best]
+    return np.concatenate((best[np.argsort(keys[best])], survivors[num_best:]))
+
+
+def local_search(population, num_local_searches, score_threshold, cancelled=None, tabu=None, arena=None):
+    """
+    Runs one round of local search over every cube of a population at once.
+
+    This is the vectorized kernel behind `BeesAlgorithm.local_search`. It only depends on the population and plain
+    parameters, so worker processes can run it on a slice of the swarm (see `parallel.SearchPool`).
+
+    Args:
+        population (Population): The cubes to improve. It is not modified.
+        num_local_searches (int): Number of candidates tried for each cube.
+        score_threshold (int): Score below which edge-oriented candidates use fewer algorithms.
+        cancelled (function, optional): Cancellation check passed to `Population.make_alg`. Once it returns True, the
+                                        candidates keep the algorithms applied so far and are judged as they are.
+        tabu (np.ndarray, optional): Hashes of recently visited states (see `TabuSet`). Candidates in one of these
+                                     states are neither scored nor accepted.
+        arena (StateArena, optional): Preallocated matrices for the result, the candidates and the scratch of the
+                                      gathers. The result is written to the spare population matrix, which leaves room
+                                      to append the scouts.
+
+    Returns:
+        Population: Row by row the original cube or its best candidate when that candidate has a lower score.
+    """
+    population = population.copy(arena.spare(population) if arena is not None else None)
+    scores = population.get_scores()
+    candidate_scores = np.repeat(scores, num_local_searches, axis=0)
+    candidates = population.repeat(num_local_searches, arena.candidates if arena is not None else None)
+
+    edges = candidate_scores[:, 2] == 0
+    far = edges & (candidate_scores[:, 0] > score_threshold)
+    move_counts = np.where(far, population.rng.integers(1, 5, size=len(candidates)),
+                           population.rng.integers(1, 3, size=len(candidates)))
+    journals = [
+        candidates.make_alg("random_moves_algs_moves_prim_edges", move_counts[edges], np.flatnonzero(edges),
+                            record=False, cancelled=cancelled, arena=arena),
+        candidates.make_alg("random_moves_algs_moves_prim_corners", move_counts[~edges], np.flatnonzero(~edges),
+                            record=False, cancelled=cancelled, arena=arena)
+    ]
+
+    if tabu is not None and len(tabu):
+        allowed = ~np.isin(hash_states(candidates.states), tabu)
+        candidate_fitness = np.full(len(candidates), np.iinfo(np.int64).max, dtype=np.int64)
+        candidate_fitness[allowed] = candidates.get_scores(allowed)[:, 0]
+    else:
+        candidate_fitness = candidates.get_scores()[:, 0]
+    candidate_fitness = candidate_fitness.reshape(len(population), num_local_searches)
+    best = candidate_fitness.argmin(axis=1)
+    improved = np.flatnonzero(candidate_fitness[np.arange(len(population)), best] < scores[:, 0])
+    winners = improved * num_local_searches + best[improved]
+    for journal in journals:
+        candidates.record_history(journal, winners)
+    population.replace(improved, candidates, winners)
+    Population.candidates_accepted += len(improved)
+    return population
+
+
+def scout_search(scouts, score_threshold, cancelled=None, arena=None):
+    """
+    Mutates freshly chosen scouts, the vectorized kernel behind `BeesAlgorithm.global_search`.
+
+    Args:
+        scouts (Population): Copies of the source cubes chosen for the scouts.
+        score_threshold (int): Score below which edge-oriented scouts use fewer algorithms.
+        cancelled (function, optional): Cancellation check passed to `Population.make_alg`. Once it returns True, the
+                                        scouts keep the algorithms applied so far.
+        arena (StateArena, optional): Preallocated matrices, the mutated scouts are written to its scout matrix and the
+                                      gathers use its scratch matrices.
+
+    Returns:
+        Population: The mutated scouts.
+    """
+    scouts = scouts.copy(arena.scouts if arena is not None else None)
+    scores = scouts.get_scores()
+
+    # If the corner_score is 0, random edge algorithms are applied, else random corner algorithms are applied
+    # If the score is below the threshold, the number of moves for edges is limited to 4,
+    # else it is limited to 60
+    edges = scores[:, 2] == 0
+    close = np.flatnonzero(edges & (scores[:, 0] <= score_threshold))
+    far = np.flatnonzero(edges & (scores[:, 0] > score_threshold))
+    corners = np.flatnonzero(~edges)
+    scouts.make_alg("random_moves_algs_moves_prim_edges", scouts.rng.integers(1, 5, size=len(close)), close,
+                    cancelled=cancelled, arena=arena)
+    scouts.make_alg("random_algs_edges", scouts.rng.integers(0, 61, size=len(far)), far, cancelled=cancelled,
+                    arena=arena)
+    scouts.make_alg("random_moves_algs_moves_prim_edges", scouts.rng.integers(1, 41, size=len(far)), far,
+                    cancelled=cancelled, arena=arena)
+    scouts.make_alg("random_moves_algs_moves_prim_corners", scouts.rng.integers(1, 31, size=len(corners)), corners,
+                    cancelled=cancelled, arena=arena)
+    return scouts
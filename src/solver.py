@@ -1,14 +1,39 @@
-import random
+import contextlib
+import cProfile
 import time
-import csv
 import os
+import numpy as np
 import tqdm
-from .rubikscube import RubiksCube
+from .population import Population, StateArena
+from .sampling import fresh_seed
+from .parallel import SearchPool
+from . import search
+from .search import TabuSet
 from .permutation_table import translate_moves
+from .logsink import open_sink
+
+execution_columns = ['initial_population_size', 'num_scouts', 'num_local_searches', 'max_iterations', 'execution_id',
+                     'num_iterations', 'execution_time']
+iteration_columns = ['initial_population_size', 'num_scouts', 'num_local_searches', 'max_iterations', 'execution_id',
+                     'iteration', 'score', 'corner_score', 'edge_score']
+
+# Per-phase timings in nanoseconds (perf_counter_ns) and work counters (see `Population.counter_info`) appended to the
+# logs. The execution log holds the totals of the run, including the time spent on logging and callbacks.
+phase_columns = ['local_search_ns', 'global_search_ns', 'selection_ns']
+counter_columns = ['moves', 'copies', 'scores', 'accepted']
+
+# Verbosity levels of `BeesAlgorithm.set_verbosity`, each one printing everything the lower ones print:
+# "results" prints the outcome of a run, "iterations" the score banner of every iteration and "progress" adds tqdm bars.
+verbosity_levels = {"quiet": 0, "results": 1, "iterations": 2, "progress": 3}
+
+execution_log_columns = (execution_columns + phase_columns + ['logging_ns'] + counter_columns +
+                         ['stop_reason', 'restarts', 'seed', 'scramble'])
+iteration_log_columns = iteration_columns + phase_columns + counter_columns
 
 
 class BeesAlgorithm:
-    def __init__(self, cube, initial_population_size, num_scouts, num_local_searches, max_iterations):
+    def __init__(self, cube, initial_population_size, num_scouts, num_local_searches, max_iterations, num_workers=1,
+                 seed=None):
         """
         Initializes a new instance of the Bees Algorithm solver for cube problems.
 
@@ -22,19 +47,47 @@ class BeesAlgorithm:
             num_scouts (int): The number of scout bees used to identify promising regions in the search space.
             num_local_searches (int): The number of searches each selected site undergoes, similar to bees exploring a neighborhood.
             max_iterations (int): The maximum number of iterations or foraging rounds the algorithm performs.
+            num_workers (int): Number of worker processes the local search and the scouts are spread over. With 1,
+                               everything runs in the calling thread.
+            seed (int, optional): Seed of the random generators, so a run can be repeated exactly. A fresh seed is drawn
+                                  when omitted; either way it is recorded in the execution log.
 
         Attributes:
             best_cubes (list): Initially contains just the base cube, intended to store the best solutions found (best sites).
             cube (Cube): The original cube instance, used as a reference and to reset and scramble (source hive).
             solved_cube (Cube): A copy of the original cube intended to represent the solved state.
             initial_population_size (int): The number of cubes in the initial population, representing the swarm size.
-            population (list): The initial population of cube instances derived from the base cube, representing the swarm.
+            population (Population): The swarm, stored as rows of one sticker matrix and initialised with copies of the base cube.
             num_scouts (int): Number of scout bees.
             num_local_searches (int): Number of local search iterations per promising site.
             max_iterations (int): The maximum number of foraging rounds.
             score_threshold (int): A threshold used to determine the intensity and type of mutations during search, similar to choosing richer sites for more intense exploration.
             solution (str): The final solution found by the algorithm, represented as a sequence of moves.
             save (bool): A flag indicating whether to save the solution to a file.
+            seed (int): Seed of `rng` and of the worker streams, see `sampling.fresh_seed`.
+            rng (np.random.Generator): Random generator used for the batched moves of the population.
+            pool (SearchPool): The worker processes when `num_workers` is above 1, otherwise None.
+            arena (StateArena): Preallocated sticker matrices the population, the candidates and the scouts are
+                                written to, and the scratch matrices of the gathers of the moves.
+            profile_dir (str): Directory to write a cProfile dump of every run to, None to disable profiling.
+            verbosity (int): How much is printed to the console, one of the values of `verbosity_levels`.
+            iteration_times (dict): Nanoseconds spent in each phase of the last `solve` call, keyed by `phase_columns`.
+            phase_times (dict): Nanoseconds spent in each phase and in logging over the current run.
+            counters (dict): Work counters of the current run, keyed by `counter_columns`.
+            log_sink (LogSink): Where the execution and iteration logs are written, the shared CSV sink next to
+                                main.py by default (see `logsink.open_sink`).
+            time_limit (float): Wall-clock budget of a run in seconds, None for no limit (see `set_budget`).
+            max_evaluations (int): Budget of a run in scored cube states, None for no limit.
+            restart_after (int): Number of iterations without improvement after which the swarm restarts from the
+                                 scrambled cube, None to never restart (see `set_restart`).
+            best_cube (Cube): The best cube found during the current run, kept across restarts.
+            stop_reason (str): Why the last run ended: "solved", "max_iterations", "time_limit", "max_evaluations" or
+                               "aborted".
+            restarts (int): Number of restarts during the current run.
+            cancel_granularity (int): Number of rounds of algorithms between two cancellation checks inside the local
+                                      and the global search (see `set_cancel_granularity`).
+            deduplicate (bool): Whether duplicate states are ranked last when the scouts join the population.
+            tabu (TabuSet): Recently visited states the local search may not return to, None when disabled.
 
         The initialization scrambles the base cube to provide varied starting conditions for the evolutionary process,
         akin to sending out scout bees from the hive.
@@ -45,16 +98,42 @@ class BeesAlgorithm:
         self.cube.make_alg("scramble")
         self.solved_cube = cube.copy()
         self.initial_population_size = initial_population_size
-        self.population = [cube.copy() for _ in range(initial_population_size)]
+        self.seed = seed if seed is not None else fresh_seed()
+        self.rng = np.random.default_rng(self.seed)
+        self.num_workers = num_workers
+        self.pool = SearchPool(num_workers, self.seed) if num_workers > 1 else None
+        self.arena = StateArena(initial_population_size, num_scouts, num_local_searches)
+        self.population = Population.from_cubes([cube], self.rng).repeat(initial_population_size,
+                                                                          self.arena.populations[0])
         self.num_scouts = num_scouts
         self.num_local_searches = num_local_searches
         self.max_iterations = max_iterations
         self.score_threshold = 5
         self.solution = ""
         self.save = False
+        self.profile_dir = None
+        self.verbosity = verbosity_levels["progress"]
+        self.iteration_times = dict.fromkeys(phase_columns, 0)
+        self.phase_times = dict.fromkeys(phase_columns + ['logging_ns'], 0)
+        self.counters = dict.fromkeys(counter_columns, 0)
+        self.time_limit = None
+        self.max_evaluations = None
+        self.restart_after = None
+        self.best_cube = self.solved_cube
+        self.stop_reason = None
+        self.restarts = 0
+        self.cancel_granularity = 1
+        self.deduplicate = True
+        self.tabu = None
+        self._cancel_calls = 0
+        self._progress = None
+        self._stop_event = None
+        self._deadline = None
+        self._score_limit = None
+        self._swarm_key = None
 
         self.execution_id = int(time.time())  # Unique ID for each execution based on current time
-        self.init_csv_files()
+        self.log_sink = open_sink()
 
 
     def set_save(self, save):
@@ -66,52 +145,162 @@ class BeesAlgorithm:
         """
         self.save = save
 
-    def local_search(self, cube):
+    def set_profile(self, profile_dir):
+        """
+        Enables a cProfile dump of every run, written to `<profile_dir>/profile_<execution_id>.prof`.
+
+        Only the calling process is profiled; with worker processes, the time spent in them shows up as waiting.
+
+        Args:
+            profile_dir (str): Directory of the dumps, None to disable profiling.
+        """
+        self.profile_dir = profile_dir
+
+    def set_budget(self, time_limit=None, max_evaluations=None):
+        """
+        Makes runs anytime: when a budget is exhausted, the run stops after the current iteration and reports the best
+        cube found so far, with its partial solution, instead of running on to `max_iterations`.
+
+        Args:
+            time_limit (float, optional): Wall-clock budget of a run in seconds.
+            max_evaluations (int, optional): Budget of a run in scored cube states (the `scores` counter).
+        """
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+
+    def set_deduplicate(self, deduplicate):
+        """
+        Sets whether `solve` ranks duplicate states last when the scouts join the population, so the selection does
+        not spend its places on identical bees while distinct states are left. Duplicates are kept, not removed.
+
+        Args:
+            deduplicate (bool): True to rank duplicates last.
+        """
+        self.deduplicate = deduplicate
+
+    def set_tabu_size(self, tabu_size):
+        """
+        Enables a tabu set of the most recently selected states. The local search does not score or accept candidates
+        in one of these states, which keeps bees from cycling back to states already explored.
+
+        Args:
+            tabu_size (int): Maximum number of remembered states, 0 or None to disable the tabu set.
+        """
+        self.tabu = TabuSet(tabu_size) if tabu_size else None
+
+    def set_cancel_granularity(self, cancel_granularity):
+        """
+        Sets how often the local and the global search check whether the run should stop, so closing the visualizer,
+        pruning an optimiser trial or running out of budget does not wait for a whole iteration.
+
+        The check runs between rounds of algorithms, each round being one vectorized step over all active bees, so
+        checking every round costs well under a percent of an iteration.
+
+        Args:
+            cancel_granularity (int): Number of rounds between two checks, at least 1.
+        """
+        self.cancel_granularity = max(1, cancel_granularity)
+
+    def set_restart(self, restart_after):
         """
-        Performs local search to improve a given cube using a set number of search iterations defined by `self.num_local_searches`.
-        This method aims to fine-tune a cube by exploring nearby configurations and identifying potentially better solutions.
+        Enables restarts of the swarm when the search stagnates.
+
+        When the best score of the current swarm has not improved for `restart_after` iterations, the swarm is reseeded
+        (see `restart`). Stagnation is measured against the best score since the last restart, so a reseeded swarm gets
+        `restart_after` iterations of its own instead of having to beat the best score of the whole run. The best cube
+        of the whole run is kept in `best_cube`.
 
-        Executes local searches on a given cube to simulate the intense exploration of a promising site by bees.
+        Args:
+            restart_after (int): Number of iterations without improvement, None to never restart.
+        """
+        self.restart_after = restart_after
 
-        This method refines a cube by simulating bees performing a thorough search around a promising site. It attempts
-        to locally optimize a cube by exploring minor variations in its configuration, aiming to find a better solution
+    def restart(self):
+        """
+        Reseeds the swarm: the best quarter of it (the leading `best_cubes`) is kept and every other bee starts over
+        from the scrambled cube. Keeping the best sites means a restart diversifies the search without throwing away
+        the progress that a slow but steady run depends on. The stagnation reference of `set_restart` is reset.
+        """
+        self._swarm_key = self._best_key(self.cube)
+        elite = self.best_cubes[:max(1, self.initial_population_size // 4)]
+        self.population = Population.from_cubes(elite + [self.cube] * (self.initial_population_size - len(elite)),
+                                                 self.rng, self.arena.populations[0])
+        self.restarts += 1
+
+    def best_so_far(self):
+        """
+        Returns the best result of the current or last run.
+
+        Returns:
+            tuple: The best cube, its moves from the scrambled cube in standard notation, and its score tuple.
+        """
+        return self.best_cube, translate_moves(self.best_cube.move_history), self.best_cube.get_score()
+
+    def set_verbosity(self, verbosity):
+        """
+        Sets how much the solver prints. Below "progress" no progress bar is created at all, and below "iterations"
+        the per-iteration banners are not even formatted, so batch runs pay nothing for console output.
+
+        Args:
+            verbosity (str | int): A name or a value of `verbosity_levels`.
+        """
+        self.verbosity = verbosity_levels.get(verbosity, verbosity)
+
+    def set_log_sink(self, log_sink):
+        """
+        Sets where the execution and iteration logs are written.
+
+        Args:
+            log_sink (LogSink): The sink, usually shared between solvers (see `logsink.open_sink`).
+        """
+        self.log_sink = log_sink
+
+    def local_search(self, population):
+        """
+        Performs local search to improve every cube of a population using a set number of search iterations defined by `self.num_local_searches`.
+        This method aims to fine-tune the cubes by exploring nearby configurations and identifying potentially better solutions.
+
+        Executes local searches on the population to simulate the intense exploration of promising sites by bees.
+
+        This method refines the cubes by simulating bees performing a thorough search around a promising site. It attempts
+        to locally optimize each cube by exploring minor variations in its configuration, aiming to find a better solution
         near the current state.
 
-        Each iteration involves:
-        - Creating a candidate cube by copying the original.
-        - Depending on the cube's fitness scores, different algorithms are applied:
+        All candidates of all bees are handled together:
+        - Each cube is repeated `self.num_local_searches` times into one candidate population.
+        - Depending on the cube's fitness scores, different algorithms are applied to its candidates:
             * If the corner fitness score is zero, edge-oriented algorithms are applied.
             * Otherwise, corner-oriented algorithms are applied.
         - The intensity and type of algorithms depend on the cube's current score relative to a predefined threshold.
-        - After applying an algorithm, the candidate's fitness is reassessed.
-        - If the candidate's fitness is better than the best known fitness, it becomes the new best solution.
+        - After applying the algorithms, the candidates' fitness is reassessed.
+        - If the best candidate of a cube is better than the cube itself, it replaces the cube. Only the move histories
+          of these winners are recorded.
+
+        The work itself is done by `search.local_search`. With a worker pool, the population is split into one slice
+        per worker process and only the sticker rows and the added opcodes travel between the processes.
+
+        With a tabu set (see `set_tabu_size`), candidates that land on a recently visited state are skipped.
+
+        In a single process, the kernel checks `cancel_check` before each of its rounds of algorithms, so a run can be
+        stopped in the middle of the search (see `set_cancel_granularity`). Worker processes cannot see the stop event
+        or count the evaluations of the run, so with a pool they only stop early when the time budget runs out (see
+        `pool_deadline`); the stop event and the evaluation budget are checked between the phases of `solve`.
 
         Args:
-            cube (Cube): The cube instance to be locally searched.
+            population (Population): The population to be locally searched.
 
         Returns:
-            Cube: The best cube found during the local search, which may be the original cube or a better version of it.
+            Population: The best cubes found during the local search, row by row the original cubes or better versions of them.
 
-        This method aims to incrementally improve the cube's configuration by minimizing its fitness score through targeted applying of algorithms.
+        This method aims to incrementally improve the cubes' configuration by minimizing their fitness score through targeted applying of algorithms.
         """
-        best = cube.copy()
-        best_fitness, best_fitness_edges, best_fitness_corners = best.get_score()
-
-        for _ in range(self.num_local_searches):
-            candidate = cube.copy()
-            candidate_fitness, candidate_fitness_edges, candidate_fitness_corners = candidate.get_score()
-            if candidate_fitness_corners == 0:
-                if candidate_fitness <= self.score_threshold:
-                    candidate.make_alg("random_moves_algs_moves_prim_edges", move_count=random.randint(1, 2))
-                else:
-                    candidate.make_alg("random_moves_algs_moves_prim_edges", move_count=random.randint(1, 4))
-            else:
-                candidate.make_alg("random_moves_algs_moves_prim_corners", move_count=random.randint(1, 2))
-            candidate_fitness = candidate.get_score()[0]
-            if candidate_fitness < best_fitness:
-                best = candidate.copy()
-                best_fitness = candidate_fitness
-        return best
+        tabu = self.tabu.to_array() if self.tabu is not None else None
+        if self.pool is not None:
+            return self.pool.map(search.local_search, population, self.num_local_searches, self.score_threshold,
+                                 tabu=tabu, deadline=self.pool_deadline())
+        with self.phase_progress("local_search"):
+            return search.local_search(population, self.num_local_searches, self.score_threshold, self.cancel_check,
+                                       tabu, self.arena)
 
     def global_search(self):
         """
@@ -129,22 +318,25 @@ class BeesAlgorithm:
         - Other iterations use a copy of a generic cube (`cube`).
 
         During each iteration:
-        - If the cube's corner score is zero and meets specific conditions, or if the score does not meet the conditions but still qualifies based on thresholds, a cube from `best_cubes` is copied and potentially modified.
-        - Otherwise, the base cube is copied.
-        - Depending on the cube's fitness scores, different algorithms are applied to mutate the cube:
+        - If the cube's corner score is zero and meets specific conditions, or if the score does not meet the conditions but still qualifies based on thresholds, a cube from `best_cubes` is chosen as the source.
+        - Otherwise, the base cube is chosen.
+        - Depending on the sources' fitness scores, different algorithms are applied to all scouts at once:
             * If the corner score is zero, edge-focused algorithms are applied.
             * Otherwise, corner-focused algorithms are applied.
             * The number and type of moves depend on whether the cube's score is below a set threshold.
 
         The method employs random numbers to determine the amount of exploring applied, making each exploring step stochastic in nature.
+        The mutations are done by `search.scout_search`, spread over the worker pool when there is one. Like in
+        `local_search`, a single process checks for cancellation before each round of algorithms, and the workers of
+        a pool check the time budget.
 
         Returns:
-            list: A list of new cube instances that make up the new population for subsequent rounds of exploring.
+            Population: The new scouts that join the population for subsequent rounds of exploring.
         """
 
-        new_population = []
+        sources = []
         j = 0
-        for i in tqdm.tqdm(range(self.num_scouts), desc="global_search"):
+        for i in range(self.num_scouts):
 
             # Choose a cube from the best cubes if the score (corner_score or edge_score) is below the threshold
             # Fifth of the cubes will be from the best cubes, the rest from the base cube
@@ -154,28 +346,69 @@ class BeesAlgorithm:
                     corner_score != 0 and (i % 5 == 0 or corner_score <= self.score_threshold)):
                 if j >= len(self.best_cubes) or (corner_score == 0 and edge_score > self.score_threshold + 3) or (
                         corner_score != 0 and corner_score > self.score_threshold + 3):
-                    new_cube = self.best_cubes[0].copy()
+                    sources.append(self.best_cubes[0])
                 else:
-                    new_cube = self.best_cubes[int(j)].copy()
+                    sources.append(self.best_cubes[int(j)])
                     j += 0.2
             else:
-                new_cube = self.cube.copy()
+                sources.append(self.cube)
 
-            new_cube_fitness, new_cube_fitness_edges, new_cube_fitness_corners = new_cube.get_score()
+        scouts = Population.from_cubes(sources, self.rng, self.arena.sources)
+        if self.pool is not None:
+            return self.pool.map(search.scout_search, scouts, self.score_threshold, deadline=self.pool_deadline())
+        with self.phase_progress("global_search"):
+            return search.scout_search(scouts, self.score_threshold, self.cancel_check, self.arena)
 
-            # If the corner_score is 0, random edge algorithms are applied, else random corner algorithms are applied
-            # If the score is below the threshold, the number of moves for edges is limited to 4,
-            # else it is limited to 60
-            if new_cube_fitness_corners == 0:
-                if new_cube_fitness <= self.score_threshold:
-                    new_cube.make_alg("random_moves_algs_moves_prim_edges", move_count=random.randint(1, 4))
-                else:
-                    new_cube.make_alg("random_algs_edges", move_count=random.randint(0, 60))
-                    new_cube.make_alg("random_moves_algs_moves_prim_edges", move_count=random.randint(1, 40))
-            else:
-                new_cube.make_alg("random_moves_algs_moves_prim_corners", move_count=random.randint(1, 30))
-            new_population.append(new_cube)
-        return new_population
+    @contextlib.contextmanager
+    def phase_progress(self, description):
+        """
+        Shows a progress bar over the rounds of algorithms of one search phase, at the "progress" verbosity.
+
+        The kernels call `cancel_check` before every round, which advances the bar, so it follows the actual work of
+        the phase. Worker processes do not report their rounds, so there is no bar with a pool.
+
+        Args:
+            description (str): Label of the bar, the name of the phase.
+        """
+        if self.verbosity < verbosity_levels["progress"] or self.pool is not None:
+            yield
+            return
+        self._progress = tqdm.tqdm(desc=description, unit="round", leave=False)
+        try:
+            yield
+        finally:
+            self._progress.close()
+            self._progress = None
+
+    def cancelled(self):
+        """
+        Checks whether the current run should stop: its stop event is set or its time or evaluation budget is spent.
+
+        Returns:
+            bool: True when the run should stop as soon as possible.
+        """
+        return ((self._stop_event is not None and self._stop_event.is_set()) or
+                (self._deadline is not None and time.perf_counter() >= self._deadline) or
+                (self._score_limit is not None and Population.rows_scored >= self._score_limit))
+
+    def pool_deadline(self):
+        """
+        Returns the deadline of the current run as a `time.time` value, the form the workers of a `SearchPool` can
+        compare against, or None when the run has no time budget.
+        """
+        if self._deadline is None:
+            return None
+        return time.time() + self._deadline - time.perf_counter()
+
+    def cancel_check(self):
+        """
+        The cancellation check passed to the search kernels, running `cancelled` on every `cancel_granularity`-th call.
+        Every call is one round of algorithms, counted by the bar of `phase_progress`.
+        """
+        if self._progress is not None:
+            self._progress.update()
+        self._cancel_calls += 1
+        return self._cancel_calls % self.cancel_granularity == 0 and self.cancelled()
 
     def solve(self):
         """
@@ -184,14 +417,24 @@ class BeesAlgorithm:
         improves the population based on their scores, and determines the best solutions.
 
         The process involves:
-        1. Applying a local search to each cube in the current population.
+        1. Applying a local search to all cubes of the current population at once.
         2. Extending the population with results from a global search.
         3. Sorting the population based on the cubes' scores, prioritizing cubes with a specific score pattern.
         4. Selecting the top 25% of cubes based on their scores to keep in `best_cubes`.
         5. Reducing the population to the top 50% based on their scores for further processing.
 
+        With `deduplicate`, only the first of several bees in the same state competes in the selection; the other
+        copies are only used when there are not enough distinct states to fill the cuts, so the population keeps its
+        size. With a tabu set, the survivors are added to it.
+
+        The time spent in the local search, the global search and the selection is stored in `iteration_times`.
+
         During the sort operation, each cube is sorted by the third element of its score tuple (corner_score) primarily,
-        and conditionally by the second element (edge_score) if the third element is zero.
+        and conditionally by the second element (edge_score) if the third element is zero. Ties keep the population
+        order. The ranking is one integer key per row (`search.selection_keys`): `np.argpartition` makes the 50% and
+        25% cuts and only the best 25% are fully sorted (`search.select_rows`). Only these best cubes are materialised
+        as `RubiksCube` objects. The survivors are copied into the spare matrix of `arena`, which the next local search
+        reads from.
 
         After sorting and trimming the population:
         - The method checks each cube in the population to see if it has been solved (i.e., first element of the score is 0).
@@ -203,55 +446,57 @@ class BeesAlgorithm:
                    move history. If no solution was found, returns the first cube from the sorted list and an empty list of moves.
         """
 
-        self.population = [self.local_search(cube) for cube in tqdm.tqdm(self.population, desc="local_search")]
-
-        self.population.extend(self.global_search())
-
-        self.population.sort(key=lambda x: (x.get_score()[2], x.get_score()[1] if x.get_score()[2] == 0 else 0))
-        self.best_cubes = self.population[:len(self.population) // 4]
-        self.population = self.population[:len(self.population) // 2]
-
-        for cube in self.population:
-            if cube.get_score()[0] == 0:
-                cube.solved = True
-                return True, cube, translate_moves(cube.move_history)
-        return False, self.population[0], []
-
-    def init_csv_files(self):
-        # Execution log file
-        if not os.path.exists('execution_log.csv'):
-            with open('execution_log.csv', mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([
-                    'initial_population_size', 'num_scouts', 'num_local_searches',
-                    'max_iterations', 'execution_id', 'num_iterations', 'execution_time'
-                ])
-
-        # Iteration log file
-        if not os.path.exists('iteration_log.csv'):
-            with open('iteration_log.csv', mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([
-                    'initial_population_size', 'num_scouts', 'num_local_searches',
-                    'max_iterations', 'execution_id', 'iteration', 'score', 'corner_score', 'edge_score'
-                ])
+        start = time.perf_counter_ns()
+        self.population = self.local_search(self.population)
+        local_search_end = time.perf_counter_ns()
+
+        # A cancelled run skips the scouts, the selection below is quick and keeps the results consistent.
+        if not self.cancelled():
+            self.population.extend(self.global_search())
+        global_search_end = time.perf_counter_ns()
+
+        merged_size = len(self.population)
+        scores = self.population.get_scores()
+        duplicates = None
+        if self.deduplicate:
+            duplicates = np.ones(merged_size, dtype=bool)
+            duplicates[self.population.unique_rows()] = False
+        survivors = search.select_rows(search.selection_keys(scores, duplicates), merged_size // 2, merged_size // 4)
+        self.best_cubes = self.population.to_cubes(survivors[:merged_size // 4])
+        self.population = self.population.take(survivors, self.arena.spare(self.population))
+        if self.tabu is not None:
+            self.tabu.add(self.population.hashes())
+        self.iteration_times = {'local_search_ns': local_search_end - start,
+                                'global_search_ns': global_search_end - local_search_end,
+                                'selection_ns': time.perf_counter_ns() - global_search_end}
+
+        for row in np.flatnonzero(scores[survivors, 0] == 0):
+            cube = self.population.to_cube(row)
+            cube.solved = True
+            return True, cube, translate_moves(cube.move_history)
+        return False, self.population.to_cube(0), []
+
+    @staticmethod
+    def _best_key(cube):
+        score = cube.get_score()
+        return score[2], score[1]
 
     def log_execution(self, num_iterations, execution_time):
-        with open('execution_log.csv', mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                self.initial_population_size, self.num_scouts, self.num_local_searches,
-                self.max_iterations, self.execution_id, num_iterations, execution_time
-            ])
-
-    def log_iteration(self, iteration, score, corner_score, edge_score):
-        with open('iteration_log.csv', mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                self.initial_population_size, self.num_scouts, self.num_local_searches,
-                self.max_iterations, self.execution_id, iteration, score, corner_score, edge_score
-            ])
-    def run_solver(self, lock, stop_event, callback=None):
+        self.log_sink.write('execution_log', execution_log_columns, [
+            self.initial_population_size, self.num_scouts, self.num_local_searches,
+            self.max_iterations, self.execution_id, num_iterations, execution_time
+        ] + [self.phase_times[column] for column in phase_columns + ['logging_ns']]
+          + [self.counters[column] for column in counter_columns]
+          + [self.stop_reason, self.restarts, self.seed, self.cube.scramble])
+
+    def log_iteration(self, iteration, score, corner_score, edge_score, counters=None):
+        counters = counters or dict.fromkeys(counter_columns, 0)
+        self.log_sink.write('iteration_log', iteration_log_columns, [
+            self.initial_population_size, self.num_scouts, self.num_local_searches,
+            self.max_iterations, self.execution_id, iteration, score, corner_score, edge_score
+        ] + [self.iteration_times[column] for column in phase_columns]
+          + [counters[column] for column in counter_columns])
+    def run_solver(self, lock, stop_event, callback=None, on_iteration=None):
         """
         Executes the solving process for the Rubik's Cube in a potentially multithreaded environment. It uses a stop event
         to allow external control over the duration of the solving process and a lock to handle resource synchronization.
@@ -264,6 +509,9 @@ class BeesAlgorithm:
             lock (threading.Lock): A lock used to synchronize access to shared resources, particularly for the callback and updating the cube state.
             stop_event (threading.Event): An event that can be set externally to signal the solver to stop running.
             callback (function, optional): A function to call after each iteration, which receives the latest solution and the cube state.
+            on_iteration (function, optional): A function called with the same values as `log_iteration` (iteration, score,
+                                               corner_score, edge_score) after each iteration. It may set `stop_event`
+                                               to end the run early, which is how the optimiser prunes bad trials.
 
         Workflow:
             1. Initialize the solving process and display the initial state.
@@ -272,24 +520,59 @@ class BeesAlgorithm:
             4. After exiting the loop, check the reason for termination: solution found, aborted by stop event, or iteration limit reached.
             5. Display the final state and statistics, including the total time taken for the attempt.
 
+        Each iteration's phase timings and work counters are added to `phase_times` and `counters`, and written to the
+        iteration and execution logs. With `set_profile`, the whole run is profiled with cProfile.
+
+        With `set_budget`, the run also stops after the iteration in which its time or evaluation budget runs out. When
+        a run ends unsolved because of its budget or `max_iterations`, the callback receives the best cube of the whole
+        run (see `best_so_far`). With `set_restart`, the swarm restarts
+        when the best score stagnates. The reason the run ended is stored in `stop_reason`.
+
         Note:
-            - The method prints detailed information about each iteration's progress and the final outcome directly to the console.
+            - The method prints detailed information about each iteration's progress and the final outcome directly to the console,
+              as far as `verbosity` allows (see `set_verbosity`).
             - The callback function, if provided, should accept two parameters: the list of moves and the cube object, allowing external
               components to respond to updates in real time.
         """
-        print(f"________________________\nIteration: {0}")
+        print_iterations = self.verbosity >= verbosity_levels["iterations"]
+        print_results = self.verbosity >= verbosity_levels["results"]
+        if print_iterations:
+            print(f"________________________\nIteration: {0}")
 
-        print(f"\nScore: {self.solved_cube.get_score()[0]}\nScore_corners: {self.solved_cube.get_score()[2]}\n"
-              f"Score_edges: {self.solved_cube.get_score()[1]}\n________________________\n\n")
+            print(f"\nScore: {self.solved_cube.get_score()[0]}\nScore_corners: {self.solved_cube.get_score()[2]}\n"
+                  f"Score_edges: {self.solved_cube.get_score()[1]}\n________________________\n\n")
 
         is_solved = False
+        budget_reason = None
         i = 0
+        stagnant = 0
+        best_key = self._best_key(self.solved_cube)
+        self._swarm_key = best_key
+        self.best_cube = self.solved_cube
+        self.restarts = 0
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        self._stop_event = stop_event
+        self._deadline = deadline
+        self._score_limit = None if self.max_evaluations is None else Population.rows_scored + self.max_evaluations
+        self.phase_times = dict.fromkeys(phase_columns + ['logging_ns'], 0)
+        self.counters = dict.fromkeys(counter_columns, 0)
+        profiler = cProfile.Profile() if self.profile_dir else None
+        if profiler is not None:
+            profiler.enable()
         start_time = time.time()
-        while not stop_event.is_set() and not is_solved and not i > self.max_iterations:
-            if i != 0:
+        while not stop_event.is_set() and not is_solved and not i > self.max_iterations and budget_reason is None:
+            if i != 0 and print_iterations:
                 print(f"________________________\nIteration: {i}")
 
+            counters_before = Population.counter_info()
             is_solved, new_cube, solution = self.solve()
+            logging_start = time.perf_counter_ns()
+            counters = {column: value - counters_before[column]
+                        for column, value in Population.counter_info().items()}
+            for column in phase_columns:
+                self.phase_times[column] += self.iteration_times[column]
+            for column in counter_columns:
+                self.counters[column] += counters[column]
             new_cube = new_cube.copy()
 
             with lock:
@@ -300,24 +583,54 @@ class BeesAlgorithm:
             score = self.solved_cube.get_score()[0]
             corner_score = self.solved_cube.get_score()[2]
             edge_score = self.solved_cube.get_score()[1]
-            self.log_iteration(i, score, corner_score, edge_score)
-
-            print(
-                f"\nScore: {self.solved_cube.get_score()[0]}\nScore_corners: {self.solved_cube.get_score()[2]}\n"
-                f"Score_edges: {self.solved_cube.get_score()[1]}\n________________________\n\n")
+            self.log_iteration(i, score, corner_score, edge_score, counters)
+            if on_iteration:
+                on_iteration(i, score, corner_score, edge_score)
+
+            key = self._best_key(self.solved_cube)
+            if key < best_key:
+                best_key = key
+                self.best_cube = self.solved_cube
+            if key < self._swarm_key:
+                self._swarm_key = key
+                stagnant = 0
+            else:
+                stagnant += 1
+            if self.restart_after is not None and stagnant >= self.restart_after and not is_solved:
+                self.restart()
+                stagnant = 0
+            if deadline is not None and time.perf_counter() >= deadline:
+                budget_reason = "time_limit"
+            elif self.max_evaluations is not None and self.counters['scores'] >= self.max_evaluations:
+                budget_reason = "max_evaluations"
+
+            if print_iterations:
+                print(
+                    f"\nScore: {self.solved_cube.get_score()[0]}\nScore_corners: {self.solved_cube.get_score()[2]}\n"
+                    f"Score_edges: {self.solved_cube.get_score()[1]}\n________________________\n\n")
+            self.phase_times['logging_ns'] += time.perf_counter_ns() - logging_start
 
             i += 1
         end_time = time.time()
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.profile_dir, f"profile_{self.execution_id}.prof"))
+        if self.pool is not None:
+            self.pool.close()
+        self._stop_event = self._deadline = self._score_limit = None
 
         found_solution = " ".join(translate_moves(self.solved_cube.move_history))
         execution_time = int(end_time - start_time)
 
         if is_solved:
-            print(
-                f"\n\n\n________________________________________________\n\nSolved the Rubik's Cube!\n\n"
-                f"Found Solution: \n\n{found_solution}\n\n________________________________________________\n\n")
+            self.stop_reason = "solved"
+            if print_results:
+                print(
+                    f"\n\n\n________________________________________________\n\nSolved the Rubik's Cube!\n\n"
+                    f"Found Solution: \n\n{found_solution}\n\n________________________________________________\n\n")
+                print(f"Time taken: {int(end_time - start_time)} seconds")
             self.solution = found_solution
-            print(f"Time taken: {int(end_time - start_time)} seconds")
             if self.save:
                 solution_filename = f"solution_{int(time.time())}.txt"
                 with open("solutions/" + solution_filename, 'w') as file:
@@ -328,18 +641,34 @@ class BeesAlgorithm:
                                f" num_scouts={self.num_scouts}, num_local_searches={self.num_local_searches},"
                                f" max_iterations={self.max_iterations}\n\n"
                                f"\n\n{found_solution}")
-                print(f"Solution saved to {solution_filename}")
+                if print_results:
+                    print(f"Solution saved to {solution_filename}")
+
+        elif budget_reason is not None:
+            self.stop_reason = budget_reason
+            best_cube, best_moves, best_score = self.best_so_far()
+            if callback:
+                callback(best_moves, best_cube.copy())
+            if print_results:
+                print(f"Budget exhausted ({budget_reason}), best score so far: {best_score[0]}\n"
+                      f"Partial solution: \n\n{' '.join(best_moves)}")
 
         elif i > self.max_iterations:
+            self.stop_reason = "max_iterations"
+            best_cube, best_moves, best_score = self.best_so_far()
             if callback:
-                callback(self.population[0].move_history, self.population[0])
-            print("Above Limit, Aborting")
+                callback(best_moves, best_cube.copy())
+            if print_results:
+                print(f"Above Limit, Aborting, best score so far: {best_score[0]}")
 
         else:
+            self.stop_reason = "aborted"
             if callback:
                 callback([], self.solved_cube)
-            print("Aborted")
+            if print_results:
+                print("Aborted")
         self.log_execution(i, execution_time)
+        self.log_sink.flush()
         return execution_time if is_solved else execution_time * 2
 
     def solver_thread(self, lock, stop_event, callback=None):
@@ -0,0 +1,69 @@
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from src.logsink import CsvSink
+from src.permutation_table import make_corpus
+from src.rubikscube import RubiksCube
+from src.solver import BeesAlgorithm
+
+
+class RestartTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def make_solver(self, restart_after, max_iterations):
+        solver = BeesAlgorithm(RubiksCube(make_corpus(1, 50, 3)[0]), 20, 20, 10, max_iterations, seed=2)
+        solver.set_log_sink(CsvSink(self.directory.name))
+        solver.set_verbosity("quiet")
+        solver.set_restart(restart_after)
+        return solver
+
+    def test_restart_keeps_the_best_quarter_in_front(self):
+        solver = self.make_solver(1, 3)
+        solver.solve()
+        solver.solve()
+        elite = solver.best_cubes[:solver.initial_population_size // 4]
+        solver._swarm_key = (0, 0)
+        solver.restart()
+
+        self.assertEqual(len(solver.population), solver.initial_population_size)
+        np.testing.assert_array_equal(solver.population.states[:len(elite)], np.stack([cube.state for cube in elite]))
+        np.testing.assert_array_equal(solver.population.states[len(elite):],
+                                      np.broadcast_to(solver.cube.state, (len(solver.population) - len(elite),
+                                                                          solver.cube.state.size)))
+        self.assertEqual(solver._swarm_key, solver._best_key(solver.cube))
+        self.assertEqual(solver.restarts, 1)
+
+    def test_best_cube_never_gets_worse(self):
+        solver = self.make_solver(1, 10)
+        keys = []
+        swarm_keys = []
+        restart = solver.restart
+
+        def record_restart():
+            restart()
+            swarm_keys.append(solver._swarm_key)
+
+        solver.restart = record_restart
+        solver.run_solver(threading.Lock(), threading.Event(),
+                          on_iteration=lambda *scores: keys.append(solver._best_key(solver.best_cube)))
+        keys.append(solver._best_key(solver.best_cube))
+
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertEqual(len(swarm_keys), solver.restarts)
+        self.assertTrue(all(key == solver._best_key(solver.cube) for key in swarm_keys))
+
+    def test_unsolved_run_reports_best_cube(self):
+        solver = self.make_solver(1, 3)
+        reported = []
+        solver.run_solver(threading.Lock(), threading.Event(), callback=lambda moves, cube: reported.append(cube))
+        self.assertEqual(solver.stop_reason, "max_iterations")
+        self.assertEqual(reported[-1].get_score(), solver.best_cube.get_score())
+
+
+if __name__ == "__main__":
+    unittest.main()